@@ -0,0 +1,316 @@
+# benchmark.py
+
+import argparse
+import json
+import platform
+import random
+import string
+import sys
+import time
+
+import ex7
+
+# Owner counts each tree scenario is run at
+TREE_SIZES = (1000, 10000, 100000)
+QUICK_TREE_SIZES = (1000, 10000)
+# Pokedex sizes for the per-owner scenario (capped at the number of species)
+POKEDEX_SIZES = (1, 10, 100, 10000)
+POKEDEX_OWNERS = 1000
+# Mixed workload: op -> weight
+MIXED_RATIOS = {"add": 50, "release": 20, "evolve": 20, "delete": 5, "new": 5}
+MIXED_OPS = 100000
+# Whole-tree reads (traversals, sort, filters) are timed this many times per size
+READ_REPEATS = 5
+# A result is a regression when its p50 is this much slower than the baseline's
+REGRESSION_THRESHOLD = 0.25
+
+
+########################
+# 1) Synthetic Workloads
+########################
+
+def make_names(kind, n, rng):
+    """
+    Return n distinct owner names in insertion order:
+      "sorted": already in alphabetical order (the worst case for an unbalanced tree)
+      "random": random lowercase names
+      "skewed": 90% share one long prefix, so every comparison scans far into the name
+    """
+    if kind == "sorted":
+        return [f"owner{i:07d}" for i in range(n)]
+    names = set()
+    ordered = []
+    while len(ordered) < n:
+        tail = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+        if kind == "skewed" and rng.random() < 0.9:
+            name = "professor_birch_research_" + tail
+        else:
+            name = tail
+        if name not in names:
+            names.add(name)
+            ordered.append(name)
+    return ordered
+
+def random_pokemon(rng, numOfSpecies):
+    """
+    Return a random species dict from the catalog.
+    """
+    return ex7.get_hoenn_catalog()["records"][rng.randrange(numOfSpecies)]
+
+def build_store(names, rng, numOfSpecies, pokedexSize=1):
+    """
+    Create an owner store with one owner per name, each holding pokedexSize distinct species.
+    """
+    store = ex7.create_owner_store()
+    for name in names:
+        node = ex7.create_owner_node(name, None)
+        ex7.insert_owner_bst(store, node)
+        for pokemon in rng.sample(ex7.get_hoenn_catalog()["records"], pokedexSize):
+            ex7.add_pokemon_to_owner(store, node, pokemon)
+    return store
+
+
+########################
+# 2) Timing & Reports
+########################
+
+def timed(samples, fn, *args):
+    """
+    Call fn(*args), append its duration in ns to samples, and return its result.
+    """
+    start = time.perf_counter_ns()
+    result = fn(*args)
+    samples.append(time.perf_counter_ns() - start)
+    return result
+
+def consume(iterable):
+    """
+    Exhaust an iterator (a traversal or report generator) and return how many items it gave.
+    """
+    count = 0
+    for _ in iterable:
+        count += 1
+    return count
+
+def percentile(sortedSamples, p):
+    """
+    Return the p-th percentile of already sorted samples.
+    """
+    return sortedSamples[min(int(p / 100 * len(sortedSamples)), len(sortedSamples) - 1)]
+
+def summarize(op, samples, **tags):
+    """
+    Return one result row: the tags plus count, throughput and latency percentiles (in us).
+    """
+    samples = sorted(samples)
+    total = sum(samples)
+    row = dict(tags)
+    row.update({
+        "op": op,
+        "count": len(samples),
+        "total_s": total / 1e9,
+        "ops_per_s": len(samples) / (total / 1e9) if total else None,
+        "p50_us": percentile(samples, 50) / 1e3,
+        "p90_us": percentile(samples, 90) / 1e3,
+        "p99_us": percentile(samples, 99) / 1e3,
+        "max_us": samples[-1] / 1e3
+    })
+    return row
+
+def result_key(row):
+    """
+    Return what identifies a result row across reports (scenario, names, size, pokedex, op).
+    """
+    return (row["scenario"], row.get("names"), row.get("size"), row.get("pokedex"), row["op"])
+
+
+########################
+# 3) Scenarios
+########################
+
+def bench_tree(names, kind, size, rng, numOfSpecies):
+    """
+    Owner tree: insert, find, traversals, sort, cross-owner filters, then delete everything.
+    """
+    tags = {"scenario": "tree", "names": kind, "size": size}
+    results = []
+    store = ex7.create_owner_store()
+    samples = []
+    for name in names:
+        node = ex7.create_owner_node(name, random_pokemon(rng, numOfSpecies))
+        timed(samples, ex7.insert_owner_bst, store, node)
+    results.append(summarize("insert", samples, **tags))
+
+    samples = []
+    for name in rng.sample(names, min(size, 10000)):
+        timed(samples, ex7.find_owner_bst, store["root"], name)
+    results.append(summarize("find", samples, **tags))
+
+    for op, iterate in ex7.PRINT_ORDERS.items():
+        samples = []
+        for _ in range(READ_REPEATS):
+            timed(samples, consume, iterate(store["root"]))
+        results.append(summarize(f"traverse_{op}", samples, **tags))
+
+    samples = []
+    for _ in range(READ_REPEATS):
+        timed(samples, consume, ex7.sorted_owner_lines(store))
+    results.append(summarize("sort", samples, **tags))
+
+    samples = []
+    for _ in range(READ_REPEATS):
+        timed(samples, consume, ex7.render_owner_lines(ex7.iter_in_order(store["root"])))
+    results.append(summarize("print", samples, **tags))
+
+    columns = ex7.get_hoenn_columns()
+    speciesMask = ex7.mask_and(ex7.mask_type(columns, "Fire"), ex7.mask_attack_above(columns, 80))
+    for op, query in (("filter_scan", lambda: ex7.filter_all_owners(columns, store["root"], speciesMask)),
+                      ("filter_indexed", lambda: ex7.query_owners(store, columns, speciesMask)),
+                      ("count_indexed", lambda: ex7.query_count(store, columns, speciesMask))):
+        samples = []
+        for _ in range(READ_REPEATS):
+            timed(samples, query)
+        results.append(summarize(op, samples, **tags))
+
+    samples = []
+    for name in rng.sample(names, size):
+        timed(samples, ex7.delete_owner_bst, store, name)
+    results.append(summarize("delete", samples, **tags))
+    return results
+
+def bench_pokedex(pokedexSize, rng, numOfSpecies):
+    """
+    Per-owner pokedex operations on POKEDEX_OWNERS owners holding pokedexSize Pokemon each.
+    """
+    tags = {"scenario": "pokedex", "pokedex": pokedexSize}
+    names = make_names("random", POKEDEX_OWNERS, rng)
+    store = build_store(names, rng, numOfSpecies, pokedexSize)
+    nodes = [ex7.find_owner_bst(store["root"], name) for name in names]
+    columns = ex7.get_hoenn_columns()
+    speciesMask = ex7.mask_can_evolve(columns)
+    results = []
+    samples = {"add": [], "release": [], "evolve": [], "filter": []}
+    for node in nodes:
+        timed(samples["filter"], ex7.filter_pokedex, columns, node.pokedex, speciesMask)
+        pokemon = rng.choice(ex7.pokedex_list(node.pokedex))
+        timed(samples["release"], ex7.release_pokemon, store, node, pokemon["Name"])
+        timed(samples["add"], ex7.add_pokemon_to_owner, store, node, pokemon)
+        timed(samples["evolve"], ex7.evolve_pokemon, store, node, pokemon["Name"])
+    for op, opSamples in samples.items():
+        results.append(summarize(op, opSamples, **tags))
+    return results
+
+def bench_mixed(kind, size, numOfOps, rng, numOfSpecies):
+    """
+    A mixed stream of MIXED_RATIOS operations against a store of size owners.
+    """
+    tags = {"scenario": "mixed", "names": kind, "size": size}
+    names = make_names(kind, size, rng)
+    store = build_store(names, rng, numOfSpecies, 5)
+    live = list(names)
+    ops = list(MIXED_RATIOS)
+    weights = [MIXED_RATIOS[op] for op in ops]
+    samples = {op: [] for op in ops}
+    nextName = 0
+    for op in rng.choices(ops, weights, k=numOfOps):
+        if op == "new":
+            name = f"new_owner_{nextName}"
+            nextName += 1
+            node = ex7.create_owner_node(name, random_pokemon(rng, numOfSpecies))
+            timed(samples[op], ex7.insert_owner_bst, store, node)
+            live.append(name)
+            continue
+        if not live:
+            continue
+        i = rng.randrange(len(live))
+        if op == "delete":
+            live[i], live[-1] = live[-1], live[i]
+            timed(samples[op], ex7.delete_owner_bst, store, live.pop())
+            continue
+        node = ex7.find_owner_bst(store["root"], live[i])
+        pokemon = random_pokemon(rng, numOfSpecies)
+        if op == "add":
+            timed(samples[op], ex7.add_pokemon_to_owner, store, node, pokemon)
+        elif op == "release":
+            timed(samples[op], ex7.release_pokemon, store, node, pokemon["Name"])
+        else:
+            timed(samples[op], ex7.evolve_pokemon, store, node, pokemon["Name"])
+    return [summarize(op, opSamples, **tags) for op, opSamples in samples.items() if opSamples]
+
+def run_benchmarks(seed, treeSizes, numOfMixedOps, log=sys.stderr):
+    """
+    Run every scenario and return the report dict: {"meta": {...}, "results": [rows]}.
+    """
+    rng = random.Random(seed)
+    numOfSpecies = len(ex7.get_hoenn_catalog()["records"])
+    ex7.get_hoenn_columns()
+    results = []
+    for kind in ("sorted", "random", "skewed"):
+        for size in treeSizes:
+            print(f"tree {kind} {size}", file=log)
+            results.extend(bench_tree(make_names(kind, size, rng), kind, size, rng, numOfSpecies))
+    for pokedexSize in sorted({min(p, numOfSpecies) for p in POKEDEX_SIZES}):
+        print(f"pokedex {pokedexSize}", file=log)
+        results.extend(bench_pokedex(pokedexSize, rng, numOfSpecies))
+    for kind in ("random", "skewed"):
+        print(f"mixed {kind}", file=log)
+        results.extend(bench_mixed(kind, treeSizes[-1], numOfMixedOps, rng, numOfSpecies))
+    ex7.load_numpy()
+    return {
+        "meta": {
+            "seed": seed,
+            "python": platform.python_version(),
+            "numpy": ex7.np.__version__ if ex7.np is not None else None,
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "species": numOfSpecies
+        },
+        "results": results
+    }
+
+def compare_reports(baseline, report, threshold=REGRESSION_THRESHOLD):
+    """
+    Return a line for every result whose p50 got more than threshold slower than in baseline.
+    """
+    before = {result_key(row): row for row in baseline["results"]}
+    lines = []
+    for row in report["results"]:
+        old = before.get(result_key(row))
+        if old is None or not old["p50_us"]:
+            continue
+        change = row["p50_us"] / old["p50_us"] - 1
+        if change > threshold:
+            label = " ".join(str(part) for part in result_key(row) if part is not None)
+            lines.append(f"REGRESSION {label}: p50 {old['p50_us']:.2f}us -> {row['p50_us']:.2f}us (+{change:.0%})")
+    return lines
+
+
+def main():
+    """
+    Entry point: run the benchmarks, write the JSON report and check --compare regressions.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the Pokedex owner store on synthetic workloads.")
+    parser.add_argument("--seed", type=int, default=2024)
+    parser.add_argument("--quick", action="store_true", help="skip the largest tree size")
+    parser.add_argument("--ops", type=int, default=MIXED_OPS, help="operations in each mixed workload")
+    parser.add_argument("--output", metavar="FILE", help="write the JSON report to FILE instead of stdout")
+    parser.add_argument("--compare", metavar="FILE", help="report p50 regressions against an earlier JSON report")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+    report = run_benchmarks(args.seed, QUICK_TREE_SIZES if args.quick else TREE_SIZES, args.ops)
+    text = json.dumps(report, indent=1)
+    if args.output:
+        with open(args.output, mode='w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare, mode='r', encoding='utf-8') as f:
+            regressions = compare_reports(json.load(f), report, args.threshold)
+        for line in regressions:
+            print(line, file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,54 +1,491 @@
+import argparse
+import array
+import bisect
+import collections
 import csv
+import functools
+import heapq
+import itertools
+import json
+import os
+import struct
+import sys
+import threading
+import time
+
+# NumPy is optional and only imported when the filter engine is first used
+# (see load_numpy); without it the engine falls back to plain lists.
+np = None
+_numpyChecked = False
 
 # Global BST root
 ownerRoot = None
 
 ########################
-# 0) Read from CSV -> HOENN_DATA
+# 0) Read from CSV -> Species Catalog
 ########################
 
 
+def iter_species_csv(filename):
+    """
+    Stream a species CSV one row at a time, by its header: ID, Name, Type, HP,
+    Attack, Can Evolve, plus an optional National ID (the species' national dex
+    number, which also names its sprite) and Evolves To (target names split by
+    "/", default first). Yield dicts:
+      { "ID": int, "Name": str, "Type": str, "HP": int, "Attack": int,
+        "Can Evolve": "TRUE"/"FALSE", "National ID": int, "Evolves To": (names) }
+    "National ID" is the ID itself when the file has no such column, and
+    "Evolves To" is None (see read_hoenn_csv).
+    """
+    with open(filename, mode='r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            if not (row.get("ID") or "").strip():
+                break  # Empty or invalid row => stop
+            poke_id = int(row["ID"])
+            national = (row.get("National ID") or "").strip()
+            evolvesTo = row.get("Evolves To")
+            yield {
+                "ID": poke_id,
+                "Name": str(row["Name"]),
+                "Type": str(row["Type"]),
+                "HP": int(row["HP"]),
+                "Attack": int(row["Attack"]),
+                "Can Evolve": str(row["Can Evolve"]).upper(),
+                "National ID": int(national) if national else poke_id,
+                "Evolves To": None if evolvesTo is None else tuple(name.strip() for name in evolvesTo.split("/")
+                                                                   if name.strip())
+            }
+
 def read_hoenn_csv(filename):
     """
-    Reads 'hoenn_pokedex.csv' and returns a list of dicts:
-      [ { "ID": int, "Name": str, "Type": str, "HP": int,
-          "Attack": int, "Can Evolve": "TRUE"/"FALSE" },
-        ... ]
+    Reads 'hoenn_pokedex.csv' (or any species CSV) and returns a list of dicts
+    (see iter_species_csv). In a file without an Evolves To column, a species
+    that can evolve evolves into the next ID of the same file.
+    """
+    data_list = list(iter_species_csv(filename))
+    by_id = {d["ID"]: d for d in data_list}
+    for d in data_list:
+        if d["Evolves To"] is None:
+            following = by_id.get(d["ID"] + 1)
+            d["Evolves To"] = (following["Name"],) if d["Can Evolve"] == "TRUE" and following else ()
+    return data_list
+
+
+def build_species_catalog(data_list):
+    """
+    Index Pokemon dicts once (any iterable, consumed as it streams in) and return a catalog dict:
+      { "records": [...],                      # rows in file order
+        "by_id": { ID: dict },                 # works for sparse IDs
+        "by_name": { casefolded name: dict },
+        "by_national": { National ID: dict },  # how owners are persisted
+        "sorted_names": [ casefolded names, sorted ],
+        "sorted_records": [ dicts, same order as sorted_names ],
+        "evolves_to": { ID: (target IDs, default first) },
+        "evolution_stage": { ID: 0 for a base form, 1 for its evolution, ... },
+        "starters": [ up to 3 starter IDs, see pick_starters ],
+        "type_names": [ each type once, in file order ],
+        "type_index": { casefolded type: position in type_names },
+        "type_of_id": { ID: position of its type in type_names },
+        "name_index": { name with deletions: [names] }, built by get_name_index,
+        "lines": { ID: formatted line }, filled in by render_owner_lines }
+    Raise ValueError if two different species share an ID; the same species
+    listed twice (say, in two regional files) is kept once.
+    """
+    records = []
+    by_id = {}
+    by_name = {}
+    by_national = {}
+    type_names = []
+    type_index = {}
+    type_of_id = {}
+    for d in data_list:
+        known = by_id.get(d["ID"])
+        if known is not None:
+            if known["Name"].casefold() != d["Name"].casefold():
+                raise ValueError(f"species ID {d['ID']} is both {known['Name']} and {d['Name']}")
+            continue
+        records.append(d)
+        by_id[d["ID"]] = d
+        by_name[d["Name"].casefold()] = d
+        by_national.setdefault(d["National ID"], d)
+        typeKey = d["Type"].casefold()
+        if typeKey not in type_index:
+            type_index[typeKey] = len(type_names)
+            type_names.append(d["Type"])
+        type_of_id[d["ID"]] = type_index[typeKey]
+    sorted_names = sorted(by_name)
+    evolves_to, evolution_stage = build_evolution_graph(by_id, by_name)
+    return {
+        "records": records,
+        "by_id": by_id,
+        "by_name": by_name,
+        "by_national": by_national,
+        "sorted_names": sorted_names,
+        "sorted_records": [by_name[n] for n in sorted_names],
+        "evolves_to": evolves_to,
+        "evolution_stage": evolution_stage,
+        "starters": pick_starters(records, evolves_to, evolution_stage),
+        "type_names": type_names,
+        "type_index": type_index,
+        "type_of_id": type_of_id,
+        "name_index": None,
+        "lines": {}
+    }
+
+def build_evolution_graph(by_id, by_name):
+    """
+    Precompute the evolution graph from the 'Can Evolve' and 'Evolves To' columns.
+    Targets are names, so they hold whatever the numbering; those missing from the
+    catalog are dropped (with none left, the species only evolves into something
+    outside it). Return (evolves_to, evolution_stage): the targets of every species
+    that can evolve here, and every species' stage in its line.
+    """
+    evolves_to = {}
+    for poke_id, d in by_id.items():
+        if d["Can Evolve"] != "TRUE":
+            continue
+        targets = tuple(by_name[name.casefold()]["ID"] for name in d["Evolves To"]
+                        if name.casefold() in by_name)
+        if targets:
+            evolves_to[poke_id] = targets
+    parent = {target: poke_id for poke_id, targets in evolves_to.items() for target in targets}
+    evolution_stage = {}
+    for poke_id in by_id:
+        stage = 0
+        ancestor = poke_id
+        while ancestor in parent:
+            ancestor = parent[ancestor]
+            stage += 1
+        evolution_stage[poke_id] = stage
+    return evolves_to, evolution_stage
+
+# How many starters a new owner chooses from
+NUM_OF_STARTERS = 3
+
+def pick_starters(records, evolves_to, evolution_stage):
+    """
+    Return the IDs of the first NUM_OF_STARTERS species (in file order) that start a
+    three-stage evolution line, topped up with other evolving base forms and then
+    any species, so every catalog offers starters (Treecko, Torchic, Mudkip for Hoenn).
+    """
+    parent = {target: poke_id for poke_id, targets in evolves_to.items() for target in targets}
+    threeStage = set()
+    for poke_id, stage in evolution_stage.items():
+        if stage == 2:
+            threeStage.add(parent[parent[poke_id]])
+    starters = [d["ID"] for d in records if d["ID"] in threeStage][:NUM_OF_STARTERS]
+    bases = [d["ID"] for d in records if d["ID"] in evolves_to and d["ID"] not in parent]
+    for poke_id in bases + [d["ID"] for d in records]:
+        if len(starters) == NUM_OF_STARTERS:
+            break
+        if poke_id not in starters:
+            starters.append(poke_id)
+    return starters
+
+def get_starters():
+    """
+    Return the starter Pokemon dicts of the loaded catalog; choice n is element n - 1.
+    """
+    catalog = get_hoenn_catalog()
+    return [catalog["by_id"][poke_id] for poke_id in catalog["starters"]]
+
+def catalog_prefix_search(catalog, prefix):
+    """
+    Return the Pokemon dicts whose name starts with prefix (case-insensitive),
+    in name order, using two binary searches over the sorted name index.
+    """
+    prefix = prefix.casefold()
+    names = catalog["sorted_names"]
+    lo = bisect.bisect_left(names, prefix)
+    hi = bisect.bisect_left(names, prefix + chr(0x10FFFF))
+    return catalog["sorted_records"][lo:hi]
+
+def edit_distance(a, b, limit=None):
+    """
+    Return the Levenshtein distance between a and b. With a limit, stop as soon as
+    the distance is known to exceed it and return limit + 1.
+    """
+    if limit is not None and abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, charA in enumerate(a, 1):
+        current = [i]
+        for j, charB in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (charA != charB)))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    if limit is not None:
+        return min(previous[-1], limit + 1)
+    return previous[-1]
+
+# Edits the name index can find matches within (see build_name_index)
+NAME_INDEX_DISTANCE = 2
+
+def deletion_variants(name, depth):
+    """
+    Return the set of strings made by deleting up to depth characters from name.
+    """
+    variants = {name}
+    frontier = {name}
+    for _ in range(depth):
+        frontier = {word[:i] + word[i + 1:] for word in frontier for i in range(len(word))}
+        variants |= frontier
+    return variants
+
+def build_name_index(names, depth=NAME_INDEX_DISTANCE):
+    """
+    Build a deletion-neighbourhood index over names: { variant: [names] }, where a
+    variant is a name with up to depth characters deleted. Two names within k <= depth
+    edits of each other always share a variant with k or fewer deletions, so a search
+    only looks up the query's own variants and checks the few names they point to.
+    """
+    index = {}
+    for name in names:
+        for variant in deletion_variants(name, depth):
+            index.setdefault(variant, []).append(name)
+    return index
+
+def get_name_index(catalog):
+    """
+    Return the catalog's name index, building it on first use.
+    """
+    if catalog["name_index"] is None:
+        catalog["name_index"] = build_name_index(catalog["sorted_names"])
+    return catalog["name_index"]
+
+def catalog_fuzzy_search(catalog, name, maxDistance):
+    """
+    Return (distance, Pokemon dict) for every species whose name is within
+    maxDistance edits of name (case-insensitive), closest first, then by name.
+    Beyond NAME_INDEX_DISTANCE every name has to be checked.
+    """
+    name = name.casefold()
+    if maxDistance <= NAME_INDEX_DISTANCE:
+        index = get_name_index(catalog)
+        candidates = set()
+        for variant in deletion_variants(name, maxDistance):
+            candidates.update(index.get(variant, ()))
+    else:
+        candidates = catalog["sorted_names"]
+    matches = []
+    for candidate in candidates:
+        distance = edit_distance(name, candidate, maxDistance)
+        if distance <= maxDistance:
+            matches.append((distance, candidate))
+    matches.sort()
+    return [(distance, catalog["by_name"][match]) for distance, match in matches]
+
+
+# The catalog file sits next to this module, wherever it is run from.
+HOENN_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hoenn_pokedex.csv")
+
+SPECIES_CACHE_MAGIC = b"PKDC"
+SPECIES_CACHE_VERSION = 3
+# magic, version, source mtime (ns), source size, number of rows
+SPECIES_CACHE_HEADER = struct.Struct("<4sHQQI")
+# ID, national ID, HP, Attack, can evolve, name length, type length, evolves-to length
+SPECIES_CACHE_ROW = struct.Struct("<HHHHBBBH")
+
+def species_cache_path(filename):
+    """
+    Return where the binary cache of a catalog CSV lives (in __pycache__ next to it).
+    """
+    folder, base = os.path.split(os.path.abspath(filename))
+    return os.path.join(folder, "__pycache__", base + ".bin")
+
+def write_species_cache(data_list, cachePath, stat):
+    """
+    Pack a list of Pokemon dicts into a binary cache stamped with the source's mtime and size.
+    """
+    chunks = [SPECIES_CACHE_HEADER.pack(SPECIES_CACHE_MAGIC, SPECIES_CACHE_VERSION,
+                                        stat.st_mtime_ns, stat.st_size, len(data_list))]
+    for d in data_list:
+        name = d["Name"].encode("utf-8")
+        kind = d["Type"].encode("utf-8")
+        evolvesTo = "/".join(d["Evolves To"]).encode("utf-8")
+        chunks.append(SPECIES_CACHE_ROW.pack(d["ID"], d["National ID"], d["HP"], d["Attack"],
+                                             d["Can Evolve"] == "TRUE", len(name), len(kind), len(evolvesTo)))
+        chunks.append(name)
+        chunks.append(kind)
+        chunks.append(evolvesTo)
+    os.makedirs(os.path.dirname(cachePath), exist_ok=True)
+    # Each process writes its own temporary file (shard workers load the catalog at
+    # the same moment), so the rename always puts a complete cache in place
+    tmpPath = f"{cachePath}.{os.getpid()}.tmp"
+    try:
+        with open(tmpPath, mode='wb') as f:
+            f.write(b"".join(chunks))
+        os.replace(tmpPath, cachePath)
+    except OSError:
+        try:
+            os.remove(tmpPath)
+        except OSError:
+            pass
+        raise
+
+def read_species_cache(cachePath, stat):
+    """
+    Return the Pokemon dicts stored in a binary cache, or None if it is missing,
+    unreadable, truncated or corrupt, or stamped with a different source mtime/size.
+    """
+    try:
+        with open(cachePath, mode='rb') as f:
+            data = f.read()
+        magic, version, mtime, size, count = SPECIES_CACHE_HEADER.unpack_from(data, 0)
+        if (magic, version, mtime, size) != (SPECIES_CACHE_MAGIC, SPECIES_CACHE_VERSION,
+                                             stat.st_mtime_ns, stat.st_size):
+            return None
+        return unpack_species_cache(data, count)
+    except (OSError, struct.error, UnicodeDecodeError):
+        return None
+
+def unpack_species_cache(data, count):
+    """
+    Unpack the count rows that follow the cache header. Return the Pokemon dicts,
+    or None if the rows do not end exactly at the end of data.
     """
     data_list = []
-    with open(filename, mode='r', encoding='utf-8') as f:
-        reader = csv.reader(f, delimiter=',')  # Use comma as the delimiter
-        first_row = True
-        for row in reader:
-            # It's the header row (like ID,Name,Type,HP,Attack,Can Evolve), skip it
-            if first_row:
-                first_row = False
-                continue
+    offset = SPECIES_CACHE_HEADER.size
+    for _ in range(count):
+        (poke_id, national, hp, attack, canEvolve,
+         nameLength, typeLength, evolvesLength) = SPECIES_CACHE_ROW.unpack_from(data, offset)
+        offset += SPECIES_CACHE_ROW.size
+        name = data[offset:offset + nameLength].decode("utf-8")
+        offset += nameLength
+        kind = data[offset:offset + typeLength].decode("utf-8")
+        offset += typeLength
+        evolvesTo = data[offset:offset + evolvesLength].decode("utf-8")
+        offset += evolvesLength
+        data_list.append({"ID": poke_id, "Name": name, "Type": kind, "HP": hp, "Attack": attack,
+                          "Can Evolve": "TRUE" if canEvolve else "FALSE", "National ID": national,
+                          "Evolves To": tuple(evolvesTo.split("/")) if evolvesTo else ()})
+    return data_list if offset == len(data) else None
 
-            # row => [ID, Name, Type, HP, Attack, Can Evolve]
-            if not row or not row[0].strip():
-                break  # Empty or invalid row => stop
-            d = {
-                "ID": int(row[0]),
-                "Name": str(row[1]),
-                "Type": str(row[2]),
-                "HP": int(row[3]),
-                "Attack": int(row[4]),
-                "Can Evolve": str(row[5]).upper()
-            }
-            data_list.append(d)
+def load_species_data(filename):
+    """
+    Same result as read_hoenn_csv(filename), but served from the binary cache when the
+    CSV has not changed since the cache was written (and the cache is refreshed when it has).
+    """
+    stat = os.stat(filename)
+    cachePath = species_cache_path(filename)
+    data_list = read_species_cache(cachePath, stat)
+    if data_list is None:
+        data_list = read_hoenn_csv(filename)
+        try:
+            write_species_cache(data_list, cachePath, stat)
+        except OSError:
+            pass  # read-only checkout: just parse the CSV every time
     return data_list
 
+def load_species_catalog(paths, national=None):
+    """
+    Build one catalog from several species CSVs (say, one per region, or a single
+    national dex), streaming their rows straight into the index. With national
+    (the default for more than one file) species are keyed by their National ID,
+    so regions with overlapping regional numbers can share a catalog.
+    Each file's bounds are read off its rows into catalog["regions"]:
+      [{"name": str, "file": path, "first_id": int, "last_id": int, "count": int}]
+    """
+    if national is None:
+        national = len(paths) > 1
+    regions = []
+
+    def stream():
+        for path in paths:
+            region = {"name": os.path.splitext(os.path.basename(path))[0].split("_")[0].capitalize(),
+                      "file": path, "first_id": None, "last_id": None, "count": 0}
+            regions.append(region)
+            for d in load_species_data(path):
+                if national:
+                    d = dict(d, ID=d["National ID"])
+                if region["count"] == 0:
+                    region["first_id"] = region["last_id"] = d["ID"]
+                else:
+                    region["first_id"] = min(region["first_id"], d["ID"])
+                    region["last_id"] = max(region["last_id"], d["ID"])
+                region["count"] += 1
+                yield d
+
+    catalog = build_species_catalog(stream())
+    catalog["regions"] = regions
+    return catalog
+
+def region_of_id(catalog, poke_id):
+    """
+    Return the first region whose ID range holds poke_id, or None.
+    """
+    for region in catalog["regions"]:
+        if region["count"] and region["first_id"] <= poke_id <= region["last_id"]:
+            return region
+    return None
+
+# Species files the catalog is loaded from (Hoenn alone, keyed by regional ID, by default)
+_speciesFiles = [HOENN_CSV]
+_speciesNational = None
+_hoennCatalog = None
+_hoennColumns = None
+
+def use_species_files(paths, national=None):
+    """
+    Switch the catalog to other species files (see load_species_catalog); it is
+    loaded on next use. Call this before any owners are created.
+    """
+    global _speciesFiles, _speciesNational, _hoennCatalog, _hoennColumns
+    _speciesFiles = list(paths)
+    _speciesNational = national
+    _hoennCatalog = None
+    _hoennColumns = None
+
+def get_species_files():
+    """
+    Return (paths, national): what the catalog is loaded from, as given to use_species_files.
+    """
+    return list(_speciesFiles), _speciesNational
 
-HOENN_DATA = read_hoenn_csv("hoenn_pokedex.csv")
+def get_hoenn_catalog():
+    """
+    Return the species catalog (Hoenn unless use_species_files says otherwise), loading it on first use.
+    """
+    global _hoennCatalog
+    if _hoennCatalog is None:
+        _hoennCatalog = load_species_catalog(_speciesFiles, _speciesNational)
+    return _hoennCatalog
+
+def get_hoenn_columns():
+    """
+    Return the columnar view of the Hoenn catalog, building it on first use.
+    """
+    global _hoennColumns
+    if _hoennColumns is None:
+        _hoennColumns = build_species_columns(get_hoenn_catalog())
+    return _hoennColumns
+
+def __getattr__(name):
+    """
+    Keep the old module-level names (ex7.HOENN_DATA etc.) working, loaded on first access.
+    """
+    if name == "HOENN_DATA":
+        return get_hoenn_catalog()["records"]
+    if name == "HOENN_CATALOG":
+        return get_hoenn_catalog()
+    if name == "HOENN_COLUMNS":
+        return get_hoenn_columns()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 ########################
 # 1) Helper Functions
 ########################
 
+def format_pokemon(pokemon):
+    """
+    Return the one-line description of a Pokemon dict.
+    """
+    return (f'ID: {pokemon.get("ID")}, Name: {pokemon.get("Name")}, Type: {pokemon.get("Type")}, '
+            f'HP: {pokemon.get("HP")}, Attack: {pokemon.get("Attack")}, Can Evolve: {pokemon.get("Can Evolve")}')
+
 def print_pokemon(pokemon):
-    print(f'ID: {pokemon.get("ID")}, Name: {pokemon.get("Name")}, Type: {pokemon.get("Type")}, '
-          f'HP: {pokemon.get("HP")}, Attack: {pokemon.get("Attack")}, Can Evolve: {pokemon.get("Can Evolve")}')
+    print(format_pokemon(pokemon))
 
 def read_int_safe(prompt):
     """
@@ -69,23 +506,49 @@ def read_int_safe(prompt):
 
 def get_poke_dict_by_id(poke_id):
     """
-    Return a copy of the Pokemon dict from HOENN_DATA by ID, or None if not found.
+    Return the Pokemon dict from the Hoenn catalog by ID, or None if not found.
+    """
+    return get_hoenn_catalog()["by_id"].get(poke_id)
+
+def get_evolution_targets(poke_id):
+    """
+    Return the Pokemon dicts this species can evolve into (default first), or [] if none.
     """
-    return HOENN_DATA[poke_id-1]
+    catalog = get_hoenn_catalog()
+    return [catalog["by_id"][target] for target in catalog["evolves_to"].get(poke_id, ())]
 
 def get_poke_dict_by_name(name):
     """
-    Return a copy of the Pokemon dict from HOENN_DATA by name, or None if not found.
+    Return the Pokemon dict from the Hoenn catalog by name (case-insensitive), or None if not found.
     """
-    i = 0
-    name = name.lower()
-    currentName = HOENN_DATA[0].get("Name").lower()
-    for i in range (135):
-        if currentName != name:
-            currentName = HOENN_DATA[i].get("Name").lower()
-        else:
-            return HOENN_DATA[i-1]
-    return None
+    return get_hoenn_catalog()["by_name"].get(name.casefold())
+
+# Suggestions are at most this many edits away (fewer for short names)
+FUZZY_MAX_DISTANCE = 2
+FUZZY_MAX_SUGGESTIONS = 3
+
+def suggest_pokemon(name, pokedex=None, limit=FUZZY_MAX_SUGGESTIONS):
+    """
+    Return up to limit Pokemon dicts whose names are close to name, closest first,
+    limited to the Pokemon in pokedex if one is given.
+    """
+    maxDistance = min(FUZZY_MAX_DISTANCE, max(1, len(name) // 3))
+    suggestions = []
+    for _, pokemon in catalog_fuzzy_search(get_hoenn_catalog(), name, maxDistance):
+        if pokedex is None or pokedex_has_id(pokedex, pokemon["ID"]):
+            suggestions.append(pokemon)
+            if len(suggestions) == limit:
+                break
+    return suggestions
+
+def did_you_mean(name, pokedex=None):
+    """
+    Return " Did you mean X?" (or "X or Y") for a name that was not found, or "" if nothing is close.
+    """
+    names = [pokemon["Name"] for pokemon in suggest_pokemon(name, pokedex)]
+    if not names:
+        return ""
+    return f" Did you mean {' or '.join(names)}?"
 
 def print_owner(pokeList):
     """
@@ -99,320 +562,1318 @@ def print_owner(pokeList):
 
 
 ########################
-# 2) BST (By Owner Name)
+# 2) Owner Tree (AVL, By Owner Name)
 ########################
 
+class OwnerNode:
+    """
+    A tree node: 'owner', 'pokedex', 'left', 'right', 'height', plus 'epoch', the
+    store epoch it was created in (see snapshot_owner_tree). Slotted, so a node
+    costs a fixed handful of pointers instead of a dict, even with millions of owners.
+    Nodes hash and compare by identity.
+    Each node also caches its own pokedex's 'hp' and 'attack' sums, and aggregates
+    of its whole subtree: 'count' (owners), 'total' (Pokemon) and 'types' (Pokemon
+    per type, an array indexed like the catalog's type_names).
+    """
+    __slots__ = ("owner", "pokedex", "left", "right", "height", "epoch",
+                 "hp", "attack", "count", "total", "types")
+
+    def __init__(self, owner, pokedex, epoch=0):
+        self.owner = owner
+        self.pokedex = pokedex
+        self.left = None
+        self.right = None
+        self.height = 1
+        self.epoch = epoch
+        update_aggregates(self)
+
 def create_owner_node(owner_name, first_pokemon):
     """
-    Create and return a BST node dict with keys: 'owner', 'pokedex', 'left', 'right'.
+    Create and return a tree node (see OwnerNode) holding first_pokemon.
+    first_pokemon may be None for an empty pokedex.
     """
-    owner_node = {"owner": owner_name,"pokedex": [first_pokemon], "left": None, "right": None}
-    return owner_node
+    pokemons = [first_pokemon] if first_pokemon is not None else []
+    return OwnerNode(owner_name, create_pokedex(pokemons))
 
-def insert_owner_bst(root, newNode):
+def own_type_counts(ownerNode):
     """
-    Insert a new BST node by owner_name (alphabetically). Return updated root.
+    Return {type position: # of Pokemon} for this owner's own pokedex.
     """
-    currentName = root.get("owner")
-    newName = newNode.get("owner")
-    currentName =currentName.lower()
-    newName = newName.lower()
-    if (newName < currentName):
-        if (root.get("left")):
-            return insert_owner_bst(root.get("left"),newNode)
-        root.update({"left": newNode})
-        if (root.get("left") == None):
-            print("Insertion failed.\n")
-            return False
+    type_of_id = get_hoenn_catalog()["type_of_id"]
+    counts = {}
+    for poke_id in ownerNode.pokedex:
+        typeIndex = type_of_id[poke_id]
+        counts[typeIndex] = counts.get(typeIndex, 0) + 1
+    return counts
+
+def update_aggregates(node):
+    """
+    Recompute a node's own HP/Attack sums and its subtree aggregates from its
+    pokedex and its children's aggregates.
+    """
+    catalog = get_hoenn_catalog()
+    by_id = catalog["by_id"]
+    node.hp = sum(by_id[poke_id]["HP"] for poke_id in node.pokedex)
+    node.attack = sum(by_id[poke_id]["Attack"] for poke_id in node.pokedex)
+    node.count = 1
+    node.total = len(node.pokedex)
+    node.types = array.array("I", bytes(4 * len(catalog["type_names"])))
+    for child in (node.left, node.right):
+        if child is not None:
+            node.count += child.count
+            node.total += child.total
+            add_type_counts(node.types, enumerate(child.types))
+    add_type_counts(node.types, own_type_counts(node).items())
+
+def add_type_counts(types, counts, sign=1):
+    """
+    Add (or with sign=-1, subtract) (type position, count) pairs to a types array.
+    """
+    for typeIndex, count in counts:
+        types[typeIndex] += sign * count
+
+def rotate_aggregates(node, pivot, moved):
+    """
+    Fix subtree aggregates after a rotation: pivot took node's place, so it takes
+    node's old aggregates; node lost pivot's subtree but gained moved (the
+    subtree that changed parents).
+    """
+    count, total, types = node.count, node.total, node.types
+    node.count = count - pivot.count
+    node.total = total - pivot.total
+    node.types = array.array("I", [a - b for a, b in zip(types, pivot.types)])
+    if moved is not None:
+        node.count += moved.count
+        node.total += moved.total
+        add_type_counts(node.types, enumerate(moved.types))
+    pivot.count, pivot.total, pivot.types = count, total, types
+
+def adjust_path_aggregates(path, pokemon, sign):
+    """
+    Account for one Pokemon added to (sign=1) or removed from (sign=-1) the pokedex
+    of path[-1], on every node of its root-to-node path.
+    """
+    typeIndex = get_hoenn_catalog()["type_of_id"][pokemon["ID"]]
+    for node in path:
+        node.total += sign
+        node.types[typeIndex] += sign
+    ownerNode = path[-1]
+    ownerNode.hp += sign * pokemon["HP"]
+    ownerNode.attack += sign * pokemon["Attack"]
+
+def owner_sort_key(ownerNode):
+    """
+    Return the key the tree orders owners by: the lowercase owner name.
+    """
+    return ownerNode.owner.lower()
+
+def create_owner_store():
+    """
+    Create and return an empty owner store dict with keys: 'root', 'size', 'leaderboard',
+    'listeners', 'index' (the cross-owner index, kept current by a listener),
+    'epoch' (nodes from older epochs are frozen) and 'snapshot' (the cached snapshot).
+    """
+    store = {"root": None, "size": 0, "leaderboard": [], "listeners": [], "index": create_owner_index(),
+             "epoch": 0, "snapshot": None}
+    store["listeners"].append(owner_index_listener(store["index"]))
+    return store
+
+def notify_listeners(store, event, ownerNode, *details):
+    """
+    Tell every listener in store['listeners'] about a change (and drop the cached
+    snapshot, which no longer matches). Events and details:
+      "new" (), "delete" (), "add" (pokemon), "release" (pokemon),
+      "evolve" (oldPokemon, newPokemon, added)
+    """
+    store["snapshot"] = None
+    for listener in store["listeners"]:
+        listener(event, ownerNode, *details)
+
+def thaw(node, epoch):
+    """
+    Return node if it belongs to this epoch (so it may be changed in place); otherwise
+    a copy of it for this epoch, with its own pokedex array and the same children.
+    Frozen nodes are shared with snapshots and are never changed.
+    """
+    if node.epoch == epoch:
+        return node
+    copy = OwnerNode.__new__(OwnerNode)
+    copy.owner = node.owner
+    copy.pokedex = Pokedex("H", node.pokedex)
+    copy.left = node.left
+    copy.right = node.right
+    copy.height = node.height
+    copy.epoch = epoch
+    copy.hp = node.hp
+    copy.attack = node.attack
+    copy.count = node.count
+    copy.total = node.total
+    copy.types = array.array("I", node.types)
+    return copy
+
+def thaw_path(store, path):
+    """
+    Make every node on a root-to-node path writable, top-down: frozen nodes are
+    replaced by copies (path copying) and each copy is linked into its parent,
+    or made the store root. Updates path in place and returns it.
+    """
+    epoch = store["epoch"]
+    for i, node in enumerate(path):
+        copy = thaw(node, epoch)
+        if copy is node:
+            continue
+        if i == 0:
+            store["root"] = copy
+        elif path[i - 1].left is node:
+            path[i - 1].left = copy
         else:
-            return True
-    if (newName > currentName):
-        if (root.get("right")):
-            return insert_owner_bst(root.get("right"),newNode)
-        root.update({"right": newNode})
-        if (root.get("right") == None):
-            print("Insertion failed.\n")
-            return False
+            path[i - 1].right = copy
+        path[i] = copy
+    return path
+
+def thaw_owner_path(store, ownerNode):
+    """
+    Return the writable root-to-node path of this owner (its subtree aggregates
+    change with its pokedex); the live owner node is the last element. Frozen nodes
+    on it are copied first. An owner no longer in the tree gets a one-node path,
+    holding a detached copy if it was frozen, so a snapshot stays intact.
+    """
+    ownerName = ownerNode.owner.lower()
+    epoch = store["epoch"]
+    frozen = False
+    path = []
+    node = store["root"]
+    while node is not None:
+        path.append(node)
+        frozen = frozen or node.epoch != epoch
+        currentName = node.owner.lower()
+        if ownerName == currentName:
+            return thaw_path(store, path) if frozen else path
+        node = node.left if ownerName < currentName else node.right
+    return [thaw(ownerNode, epoch)]
+
+def node_height(node):
+    """
+    Return the height of a subtree (0 for an empty one).
+    """
+    if node is None:
+        return 0
+    return node.height
+
+def update_height(node):
+    """
+    Recompute a node's height from its children.
+    """
+    node.height = 1 + max(node_height(node.left), node_height(node.right))
+
+def rotate_left(node):
+    """
+    Rotate a subtree left. Return the new subtree root.
+    """
+    pivot = thaw(node.right, node.epoch)
+    node.right = pivot.left
+    pivot.left = node
+    rotate_aggregates(node, pivot, node.right)
+    update_height(node)
+    update_height(pivot)
+    return pivot
+
+def rotate_right(node):
+    """
+    Rotate a subtree right. Return the new subtree root.
+    """
+    pivot = thaw(node.left, node.epoch)
+    node.left = pivot.right
+    pivot.right = node
+    rotate_aggregates(node, pivot, node.left)
+    update_height(node)
+    update_height(pivot)
+    return pivot
+
+def rebalance(node):
+    """
+    Restore the AVL property at a single (writable) node. Return the new subtree root.
+    Any frozen node a rotation has to change is copied first.
+    """
+    update_height(node)
+    balance = node_height(node.left) - node_height(node.right)
+    if balance > 1:
+        if node_height(node.left.left) < node_height(node.left.right):
+            node.left = rotate_left(thaw(node.left, node.epoch))
+        return rotate_right(node)
+    if balance < -1:
+        if node_height(node.right.right) < node_height(node.right.left):
+            node.right = rotate_right(thaw(node.right, node.epoch))
+        return rotate_left(node)
+    return node
+
+def rebalance_path(store, path):
+    """
+    Walk a root-to-node path bottom-up, rebalancing every node on it
+    and re-linking each rotated subtree to its parent (or the store root).
+    """
+    for i in range(len(path) - 1, -1, -1):
+        node = path[i]
+        newNode = rebalance(node)
+        if newNode is node:
+            continue
+        if i == 0:
+            store["root"] = newNode
+        elif path[i - 1].left is node:
+            path[i - 1].left = newNode
         else:
-            return True
-    return False
+            path[i - 1].right = newNode
 
 def find_owner_bst(root, ownerName):
     """
-    Locate a BST node by owner_name. Return that node or None if missing.
-    """
-    currentName = root.get("owner")
-    newName = ownerName
-    currentName = currentName.lower()
-    newName = newName.lower()
-    if (newName == currentName):
-        return root
-    if (newName < currentName):
-        if (root.get("left")):
-            return find_owner_bst(root.get("left"), ownerName)
-    if (newName > currentName):
-        if (root.get("right")):
-            return find_owner_bst(root.get("right"), ownerName)
+    Locate a tree node by owner_name (case-insensitive). Return that node or None if missing.
+    """
+    ownerName = ownerName.lower()
+    node = root
+    while node is not None:
+        currentName = node.owner.lower()
+        if ownerName == currentName:
+            return node
+        if ownerName < currentName:
+            node = node.left
+        else:
+            node = node.right
     return None
 
-def min_node(node):
+def insert_owner_bst(store, newNode):
+    """
+    Insert a new node by owner_name (alphabetically, case-insensitive) and rebalance.
+    Return True, or False if an owner with that name already exists.
     """
-    Return the leftmost node in a BST subtree.
+    newName = newNode.owner.lower()
+    newNode.epoch = store["epoch"]
+    newNode.left = newNode.right = None
+    update_aggregates(newNode)
+    if store["root"] is None:
+        store["root"] = newNode
+        store["size"] = 1
+        leaderboard_add(store, newNode)
+        notify_listeners(store, "new", newNode)
+        return True
+    path = []
+    node = store["root"]
+    while node is not None:
+        path.append(node)
+        currentName = node.owner.lower()
+        if newName == currentName:
+            return False
+        if newName < currentName:
+            node = node.left
+        else:
+            node = node.right
+    newTypes = own_type_counts(newNode).items()
+    for node in thaw_path(store, path):
+        node.count += 1
+        node.total += newNode.total
+        add_type_counts(node.types, newTypes)
+    parent = path[-1]
+    if newName < parent.owner.lower():
+        parent.left = newNode
+    else:
+        parent.right = newNode
+    store["size"] += 1
+    rebalance_path(store, path)
+    leaderboard_add(store, newNode)
+    notify_listeners(store, "new", newNode)
+    return True
+
+def delete_owner_bst(store, ownerName):
     """
-    while node["left"]:
-        node = node["left"]
+    Remove a node from the tree by ownerName (case-insensitive) and rebalance.
+    Return the removed node, or None if missing.
+    """
+    ownerName = ownerName.lower()
+    path = []
+    node = store["root"]
+    while node is not None:
+        currentName = node.owner.lower()
+        if ownerName == currentName:
+            break
+        path.append(node)
+        if ownerName < currentName:
+            node = node.left
+        else:
+            node = node.right
+    if node is None:
+        return None
+    nodeTypes = own_type_counts(node).items()
+    nodeSize = pokedex_size(node.pokedex)
+
+    if node.left is None or node.right is None:
+        # Zero or one child: splice the node out
+        replacement = node.left if node.left is not None else node.right
+        rebalancePath = thaw_path(store, path)
+    else:
+        # Two children: unlink the in-order successor and move the whole node
+        # (name and pokedex together) into the deleted node's place
+        successorPath = []
+        successor = node.right
+        while successor.left is not None:
+            successorPath.append(successor)
+            successor = successor.left
+        chain = thaw_path(store, path + [node] + successorPath + [successor])
+        path = chain[:len(path)]
+        node = chain[len(path)]
+        successorPath = chain[len(path) + 1:-1]
+        successor = chain[-1]
+        # The successor leaves the nodes between it and node, then takes over
+        # node's subtree minus node itself
+        successorTypes = own_type_counts(successor).items()
+        successorSize = pokedex_size(successor.pokedex)
+        for between in successorPath:
+            between.count -= 1
+            between.total -= successorSize
+            add_type_counts(between.types, successorTypes, -1)
+        successor.count = node.count - 1
+        successor.total = node.total - nodeSize
+        successor.types = array.array("I", node.types)
+        add_type_counts(successor.types, nodeTypes, -1)
+        if successorPath:
+            successorPath[-1].left = successor.right
+            successor.right = node.right
+        successor.left = node.left
+        replacement = successor
+        rebalancePath = path + [successor] + successorPath
+
+    for ancestor in path:
+        ancestor.count -= 1
+        ancestor.total -= nodeSize
+        add_type_counts(ancestor.types, nodeTypes, -1)
+    parent = path[-1] if path else None
+    if parent is None:
+        store["root"] = replacement
+    elif parent.left is node:
+        parent.left = replacement
+    else:
+        parent.right = replacement
+    if node.epoch == store["epoch"]:
+        node.left = None
+        node.right = None
+        node.height = 1
+        update_aggregates(node)
+    store["size"] -= 1
+    rebalance_path(store, rebalancePath)
+    leaderboard_remove(store, node)
+    notify_listeners(store, "delete", node)
     return node
 
+def build_balanced_tree(nodes):
+    """
+    Link nodes (already in name order, all writable) into a perfectly balanced
+    tree in O(n) and return its root. Each middle element becomes the root of its range.
+    """
+    def build(lo, hi):
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        node = nodes[mid]
+        node.left = build(lo, mid)
+        node.right = build(mid + 1, hi)
+        update_height(node)
+        update_aggregates(node)
+        return node
+    return build(0, len(nodes))
+
+def bulk_load_owners(store, newNodes):
+    """
+    Add many new owner nodes at once (names unique and not in the store yet).
+    A batch that is small next to the tree is inserted one node at a time;
+    otherwise the new nodes are sorted (linear when they arrive sorted), merged
+    with the existing ones in name order and the whole tree is rebuilt balanced.
+    """
+    if len(newNodes) * node_height(store["root"]) < store["size"]:
+        for node in newNodes:
+            insert_owner_bst(store, node)
+        return
+    epoch = store["epoch"]
+    for node in newNodes:
+        node.epoch = epoch
+    newNodes.sort(key=owner_sort_key)
+    nodes = [thaw(node, epoch) for node in
+             heapq.merge(iter_in_order(store["root"]), newNodes, key=owner_sort_key)]
+    store["root"] = build_balanced_tree(nodes)
+    store["size"] = len(nodes)
+    store["leaderboard"] = sorted(leaderboard_entry(node) for node in nodes)
+    for node in newNodes:
+        notify_listeners(store, "new", node)
+
+def snapshot_owner_tree(store):
+    """
+    Return a frozen view of the tree as it is now, in O(1): a dict with 'root' and
+    'size' that works wherever a read-only store is expected (traversals, print).
+    Starting a new epoch freezes every existing node, so later writes copy the
+    nodes they change (path copying) and the view never changes. Until the next
+    write, the same snapshot is handed out again.
+    """
+    if store["snapshot"] is None:
+        store["epoch"] += 1
+        store["snapshot"] = {"root": store["root"], "size": store["size"]}
+    return store["snapshot"]
 
-def delete_owner_bst(root, ownerName):
+def rollback_owner_store(store, snapshot):
+    """
+    Make a snapshot the live tree again. The tree itself is restored in O(1), as it
+    is shared with the snapshot, not copied (which stays valid for another rollback).
+    The leaderboard and the cross-owner index are rebuilt from it, and a journaled
+    store is checkpointed so the files agree.
     """
-    Remove a node from the BST by ownerName. Return the updated root.
+    store["root"] = snapshot["root"]
+    store["size"] = snapshot["size"]
+    store["epoch"] += 1
+    store["snapshot"] = snapshot
+    nodes = list(iter_in_order(store["root"]))
+    store["leaderboard"] = sorted(leaderboard_entry(node) for node in nodes)
+    rebuild_owner_index(store["index"], nodes)
+    if "journal" in store:
+        checkpoint_owner_store(store["journal"])
+
+def subtree_count(node):
+    """
+    Return the number of owners in a subtree (0 for an empty one).
+    """
+    return 0 if node is None else node.count
+
+def owner_name_rank(root, ownerName):
+    """
+    Return how many owners sort before ownerName (case-insensitive), whether or
+    not it is in the tree, in O(log n) using the subtree counts.
+    """
+    ownerName = ownerName.lower()
+    rank = 0
+    node = root
+    while node is not None:
+        if node.owner.lower() < ownerName:
+            rank += subtree_count(node.left) + 1
+            node = node.right
+        else:
+            node = node.left
+    return rank
+
+def owner_at(root, k):
+    """
+    Return the k-th owner node in name order (0-based), or None if out of range, in O(log n).
+    """
+    node = root
+    while node is not None:
+        leftCount = subtree_count(node.left)
+        if k < leftCount:
+            node = node.left
+        elif k == leftCount:
+            return node
+        else:
+            k -= leftCount + 1
+            node = node.right
+    return None
+
+def count_owners_in_range(root, low, high):
+    """
+    Return how many owners have a lowercase name >= low and < high, in O(log n).
+    """
+    return max(owner_name_rank(root, high) - owner_name_rank(root, low), 0)
+
+def population_stats(root):
+    """
+    Return {"owners", "pokemon", "types": {type: # of Pokemon}} for the whole tree,
+    read off the root's aggregates. Types nobody holds are left out.
     """
     if root is None:
-        return None  # Base case: Tree is empty
+        return {"owners": 0, "pokemon": 0, "types": {}}
+    typeNames = get_hoenn_catalog()["type_names"]
+    return {
+        "owners": root.count,
+        "pokemon": root.total,
+        "types": {typeNames[i]: count for i, count in enumerate(root.types) if count}
+    }
 
-    ownerName = ownerName.lower()  # Convert input to lowercase
-    currentName = root["owner"].lower()  # Convert stored owner name to lowercase
+def owner_stats(ownerNode):
+    """
+    Return {"pokemon", "hp", "attack", "avg_hp", "avg_attack"} for one owner, in O(1).
+    The averages are None for an empty pokedex.
+    """
+    size = pokedex_size(ownerNode.pokedex)
+    return {
+        "pokemon": size,
+        "hp": ownerNode.hp,
+        "attack": ownerNode.attack,
+        "avg_hp": ownerNode.hp / size if size else None,
+        "avg_attack": ownerNode.attack / size if size else None
+    }
 
-    if ownerName < currentName:
-        root["left"] = delete_owner_bst(root["left"], ownerName)  # Recur on the left subtree
-    elif ownerName > currentName:
-        root["right"] = delete_owner_bst(root["right"], ownerName)  # Recur on the right subtree
+########################
+# 3) BST Traversals
+########################
+
+def iter_bfs(root):
+    """
+    BFS level-order traversal. Yield each owner node.
+    """
+    queue = collections.deque()
+    if root is not None:
+        queue.append(root)
+    while queue:
+        node = queue.popleft()
+        yield node
+        if node.left is not None:
+            queue.append(node.left)
+        if node.right is not None:
+            queue.append(node.right)
+
+def iter_pre_order(root):
+    """
+    Pre-order traversal (root -> left -> right). Yield each owner node.
+    """
+    stack = [root] if root is not None else []
+    while stack:
+        node = stack.pop()
+        yield node
+        if node.right is not None:
+            stack.append(node.right)
+        if node.left is not None:
+            stack.append(node.left)
+
+def iter_in_order(root):
+    """
+    In-order traversal (left -> root -> right). Yield each owner node.
+    """
+    stack = []
+    node = root
+    while stack or node is not None:
+        while node is not None:
+            stack.append(node)
+            node = node.left
+        node = stack.pop()
+        yield node
+        node = node.right
+
+def iter_post_order(root):
+    """
+    Post-order traversal (left -> right -> root). Yield each owner node.
+    """
+    stack = []
+    node = root
+    lastVisited = None
+    while stack or node is not None:
+        while node is not None:
+            stack.append(node)
+            node = node.left
+        top = stack[-1]
+        if top.right is not None and top.right is not lastVisited:
+            node = top.right
+        else:
+            stack.pop()
+            yield top
+            lastVisited = top
+
+
+def iter_owner_range(root, low=None, high=None, after=None):
+    """
+    Yield owner nodes in name order whose lowercase name is >= low and < high
+    (either bound may be None), skipping names <= after when resuming from a cursor.
+    Only the O(log n) path to the first match is visited before yielding starts.
+    """
+    if after is not None:
+        after = after.lower()
+    if low is not None:
+        low = low.lower()
+    if high is not None:
+        high = high.lower()
+    stack = []
+    node = root
+    while node is not None:
+        currentName = node.owner.lower()
+        if (low is None or currentName >= low) and (after is None or currentName > after):
+            stack.append(node)
+            node = node.left
+        else:
+            node = node.right
+    while stack:
+        node = stack.pop()
+        if high is not None and node.owner.lower() >= high:
+            return
+        yield node
+        node = node.right
+        while node is not None:
+            stack.append(node)
+            node = node.left
+
+def iter_owner_prefix(root, prefix, after=None):
+    """
+    Yield owner nodes whose name starts with prefix (case-insensitive), in name order.
+    """
+    prefix = prefix.lower()
+    return iter_owner_range(root, prefix, prefix + chr(0x10FFFF), after)
+
+def owner_autocomplete(root, prefix, limit=10):
+    """
+    Return up to limit owner names starting with prefix, in name order.
+    """
+    return [node.owner for node in itertools.islice(iter_owner_prefix(root, prefix), limit)]
+
+def owner_page(root, limit, after=None, low=None, high=None):
+    """
+    Return one page of owners in name order as (nodes, cursor). Pass cursor back
+    as after= to get the next page; it is None once the listing is exhausted.
+    Raise ValueError if limit is below 1.
+    """
+    if limit < 1:
+        raise ValueError(f"page limit must be at least 1, not {limit}")
+    nodes = list(itertools.islice(iter_owner_range(root, low, high, after), limit + 1))
+    if len(nodes) <= limit:
+        return nodes, None
+    nodes.pop()
+    return nodes, nodes[-1].owner.lower()
+
+
+########################
+# 4) Pokedex Operations
+########################
+
+# From this many Pokemon on, a pokedex keeps a bitmap of the IDs it holds; below
+# it, the C-level scan of the array is as fast and costs no memory.
+POKEDEX_INDEX_MIN = 64
+
+class Pokedex(array.array):
+    """
+    A pokedex: an array('H') of species IDs in insertion (display) order, plus
+    'seen', a bitmap over catalog IDs (bit ID set when held) built by pokedex_seen
+    once the pokedex is large, so membership stays O(1) with thousands of species.
+    """
+    __slots__ = ("seen",)
+
+def create_pokedex(pokemons=()):
+    """
+    Create and return a pokedex (see Pokedex), resolved against the catalog.
+    2 bytes a Pokemon; a pokedex holds each species at most once.
+    """
+    pokedex = Pokedex("H")
+    for pokemon in pokemons:
+        pokedex_add(pokedex, pokemon)
+    return pokedex
+
+def pokedex_size(pokedex):
+    """
+    Return the number of Pokemon in a pokedex.
+    """
+    return len(pokedex)
+
+def pokedex_ids(pokedex):
+    """
+    Return the pokedex's species IDs (the array itself), in display order.
+    """
+    return pokedex
+
+def pokedex_list(pokedex):
+    """
+    Return the pokedex's Pokemon dicts as a list, in display order.
+    """
+    by_id = get_hoenn_catalog()["by_id"]
+    return [by_id[poke_id] for poke_id in pokedex]
+
+def pokedex_seen(pokedex):
+    """
+    Return the pokedex's ID bitmap, building it the first time the pokedex has
+    POKEDEX_INDEX_MIN Pokemon, or None while it is small.
+    """
+    seen = getattr(pokedex, "seen", None)
+    if seen is None and len(pokedex) >= POKEDEX_INDEX_MIN and isinstance(pokedex, Pokedex):
+        seen = pokedex.seen = bytearray((max(pokedex) >> 3) + 1)
+        for poke_id in pokedex:
+            seen[poke_id >> 3] |= 1 << (poke_id & 7)
+    return seen
+
+def pokedex_has_id(pokedex, poke_id):
+    """
+    Return True if a Pokemon with this ID is in the pokedex.
+    """
+    seen = pokedex_seen(pokedex)
+    if seen is None:
+        return poke_id in pokedex
+    return (poke_id >> 3) < len(seen) and bool(seen[poke_id >> 3] & (1 << (poke_id & 7)))
+
+def pokedex_find_by_name(pokedex, name):
+    """
+    Return the Pokemon dict with this name (case-insensitive), or None if not in the pokedex.
+    """
+    pokemon = get_poke_dict_by_name(name)
+    if pokemon is None or not pokedex_has_id(pokedex, pokemon["ID"]):
+        return None
+    return pokemon
+
+def pokedex_add(pokedex, pokemon):
+    """
+    Append a Pokemon to the pokedex. Return False (and change nothing) if its ID is already there.
+    """
+    poke_id = pokemon["ID"]
+    if pokedex_has_id(pokedex, poke_id):
+        return False
+    pokedex.append(poke_id)
+    seen = getattr(pokedex, "seen", None)
+    if seen is not None:
+        if (poke_id >> 3) >= len(seen):
+            seen.extend(bytes((poke_id >> 3) + 1 - len(seen)))
+        seen[poke_id >> 3] |= 1 << (poke_id & 7)
+    return True
+
+def pokedex_remove(pokedex, poke_id):
+    """
+    Remove a Pokemon by ID. Return the removed dict, or None if it was not there.
+    The bitmap answers whether it is there; taking it out of the array is one memmove.
+    """
+    if not pokedex_has_id(pokedex, poke_id):
+        return None
+    pokedex.remove(poke_id)
+    seen = getattr(pokedex, "seen", None)
+    if seen is not None:
+        seen[poke_id >> 3] &= ~(1 << (poke_id & 7)) & 0xFF
+    return get_poke_dict_by_id(poke_id)
+
+def add_pokemon_to_owner(ownerStore, ownerNode, newPokemon):
+    """
+    Add a Pokemon to this owner's pokedex if not duplicate. Return True if it was added.
+    """
+    # A live node is its own latest version, so a no-op needs no path
+    if ownerNode.epoch == ownerStore["epoch"] and pokedex_has_id(ownerNode.pokedex, newPokemon["ID"]):
+        return False
+    path = thaw_owner_path(ownerStore, ownerNode)
+    ownerNode = path[-1]
+    if not pokedex_add(ownerNode.pokedex, newPokemon):
+        return False
+    adjust_path_aggregates(path, newPokemon, 1)
+    leaderboard_resize(ownerStore, ownerNode, pokedex_size(ownerNode.pokedex) - 1)
+    notify_listeners(ownerStore, "add", ownerNode, newPokemon)
+    return True
+
+def release_pokemon(ownerStore, ownerNode, name):
+    """
+    Remove a Pokemon by name (case-insensitive) from this owner's pokedex.
+    Return the removed Pokemon dict, or None if it was not there.
+    """
+    if ownerNode.epoch == ownerStore["epoch"] and pokedex_find_by_name(ownerNode.pokedex, name) is None:
+        return None
+    path = thaw_owner_path(ownerStore, ownerNode)
+    ownerNode = path[-1]
+    pokemon = pokedex_find_by_name(ownerNode.pokedex, name)
+    if pokemon is None:
+        return None
+    pokedex_remove(ownerNode.pokedex, pokemon["ID"])
+    adjust_path_aggregates(path, pokemon, -1)
+    leaderboard_resize(ownerStore, ownerNode, pokedex_size(ownerNode.pokedex) + 1)
+    notify_listeners(ownerStore, "release", ownerNode, pokemon)
+    return pokemon
+
+def evolve_pokemon(ownerStore, ownerNode, name, targetId=None):
+    """
+    Evolve a Pokemon by name:
+    1) Look up its evolution in the evolution graph (targetId picks a branch, default first)
+    2) Remove old
+    3) Insert new
+    4) If new is a duplicate, remove it immediately
+    Return (old, new, added): old is None if the owner has no such Pokemon,
+    new is None if it cannot evolve, added is False if new was a duplicate.
+    Raise ValueError if targetId is not one of its evolutions.
+    """
+    if ownerNode.epoch != ownerStore["epoch"]:
+        ownerNode = thaw_owner_path(ownerStore, ownerNode)[-1]
+    pokedex = ownerNode.pokedex
+    oldPokemon = pokedex_find_by_name(pokedex, name)
+    if oldPokemon is None:
+        return None, None, False
+    targets = get_evolution_targets(oldPokemon["ID"])
+    if not targets:
+        return oldPokemon, None, False
+    newPokemon = targets[0]
+    if targetId is not None:
+        newPokemon = get_poke_dict_by_id(targetId)
+        if newPokemon not in targets:
+            raise ValueError(f"{oldPokemon['Name']} cannot evolve into ID {targetId}")
+    path = thaw_owner_path(ownerStore, ownerNode)
+    ownerNode = path[-1]
+    pokedex = ownerNode.pokedex
+    oldSize = pokedex_size(pokedex)
+    pokedex_remove(pokedex, oldPokemon["ID"])
+    adjust_path_aggregates(path, oldPokemon, -1)
+    added = pokedex_add(pokedex, newPokemon)
+    if added:
+        adjust_path_aggregates(path, newPokemon, 1)
+    leaderboard_resize(ownerStore, ownerNode, oldSize)
+    notify_listeners(ownerStore, "evolve", ownerNode, oldPokemon, newPokemon, added)
+    return oldPokemon, newPokemon, added
+
+def evolve_owner(ownerStore, ownerNode, fully=False):
+    """
+    Evolve every evolvable Pokemon of one owner at once, along the default branch,
+    one stage (or, with fully=True, stage after stage until nothing can evolve).
+    Every Pokemon evolves from the pokedex as it was before the pass: an evolution
+    is a duplicate only if its target stays in the pokedex without evolving itself.
+    Return a list of (old, new, added), one per evolution.
+    """
+    catalog = get_hoenn_catalog()
+    evolves_to = catalog["evolves_to"]
+    stage = catalog["evolution_stage"]
+    path = thaw_owner_path(ownerStore, ownerNode)
+    ownerNode = path[-1]
+    pokedex = ownerNode.pokedex
+    oldSize = pokedex_size(pokedex)
+    results = []
+    while True:
+        evolving = [catalog["by_id"][poke_id] for poke_id in pokedex if poke_id in evolves_to]
+        if not evolving:
+            break
+        keptIds = set(pokedex) - {pokemon["ID"] for pokemon in evolving}
+        # Later stages first, so each target is vacated before it is filled
+        # (and replaying the per-Pokemon events one by one gives the same pokedex)
+        evolving.sort(key=lambda pokemon: stage[pokemon["ID"]], reverse=True)
+        for oldPokemon in evolving:
+            newPokemon = catalog["by_id"][evolves_to[oldPokemon["ID"]][0]]
+            pokedex_remove(pokedex, oldPokemon["ID"])
+            adjust_path_aggregates(path, oldPokemon, -1)
+            added = newPokemon["ID"] not in keptIds and pokedex_add(pokedex, newPokemon)
+            if added:
+                adjust_path_aggregates(path, newPokemon, 1)
+            notify_listeners(ownerStore, "evolve", ownerNode, oldPokemon, newPokemon, added)
+            results.append((oldPokemon, newPokemon, added))
+        if not fully:
+            break
+    leaderboard_resize(ownerStore, ownerNode, oldSize)
+    return results
+
+def evolve_all_owners(ownerStore, fully=False):
+    """
+    Run evolve_owner on every owner in one pass over the tree. Return the number of evolutions.
+    """
+    count = 0
+    for ownerNode in iter_in_order(ownerStore["root"]):
+        count += len(evolve_owner(ownerStore, ownerNode, fully))
+    return count
+
+def evolve_message(ownerNode, name, oldPokemon, newPokemon, added):
+    """
+    Return the message describing an evolve_pokemon() result.
+    """
+    if oldPokemon is None:
+        return f"No Pokemon named '{name}' in {ownerNode.owner}'s Pokedex."
+    if newPokemon is None:
+        return f"{oldPokemon['Name']} cannot evolve."
+    message = (f"Pokemon evolved from {oldPokemon['Name']} (ID {oldPokemon['ID']}) to"
+               f" {newPokemon['Name']} (ID {newPokemon['ID']}).")
+    if not added:
+        message += f"\n {newPokemon['Name']} was already present; releasing it immediately."
+    return message
+
+def release_pokemon_by_name(ownerStore, ownerNode):
+    """
+    Prompt user for a Pokemon name, remove it from this owner's pokedex if found.
+    """
+    nameToDelete = input("Enter Pokemon Name to release: ").lower()
+    pokemon = release_pokemon(ownerStore, ownerNode, nameToDelete)
+    if pokemon is None:
+        print(f"No Pokemon named '{nameToDelete}' in {ownerNode.owner}\'s Pokedex."
+              + did_you_mean(nameToDelete, ownerNode.pokedex))
+        return
+    print(f'Releasing {pokemon["Name"]} from {ownerNode.owner}.')
+
+def evolve_pokemon_by_name(ownerStore, ownerNode):
+    """
+    Prompt user for a Pokemon name and evolve it (see evolve_pokemon).
+    """
+    oldPokemonName = input("Enter Pokemon Name to evolve: ")
+    oldPokemon = pokedex_find_by_name(ownerNode.pokedex, oldPokemonName)
+    targets = get_evolution_targets(oldPokemon["ID"]) if oldPokemon is not None else []
+    targetId = None
+    if len(targets) > 1:
+        print(f"{oldPokemon['Name']} can evolve into:")
+        for i, target in enumerate(targets, 1):
+            print(f"{i}) {target['Name']}")
+        choice = read_int_safe("Your choice: ")
+        if not 1 <= choice <= len(targets):
+            print("Invalid choice.")
+            return
+        targetId = targets[choice - 1]["ID"]
+    result = evolve_pokemon(ownerStore, ownerNode, oldPokemonName, targetId)
+    message = evolve_message(ownerNode, oldPokemonName, *result)
+    if result[0] is None:
+        message += did_you_mean(oldPokemonName, ownerNode.pokedex)
+    print(message)
+
+########################
+# 5) Sorting Owners by # of Pokemon
+########################
+
+def gather_all_owners(root, arr):
+    """
+    Collect all tree nodes into a list (arr), in order, without recursion.
+    """
+    arr.extend(iter_in_order(root))
+    return arr
+
+def leaderboard_key(ownerNode):
+    """
+    Return the leaderboard sort key of an owner: (pokedex size, lowercase name).
+    """
+    return (pokedex_size(ownerNode.pokedex), ownerNode.owner.lower())
+
+def leaderboard_entry(ownerNode):
+    """
+    Return an owner's leaderboard entry: its sort key plus its name. Entries hold
+    names, not nodes, since copy-on-write replaces an owner's node when it changes.
+    """
+    return leaderboard_key(ownerNode) + (ownerNode.owner,)
+
+def leaderboard_add(store, ownerNode):
+    """
+    File an owner in the store's leaderboard, a list of (size, lowercase name, name)
+    kept sorted by bisect so the sorted listing never has to be recomputed.
+    """
+    entry = leaderboard_entry(ownerNode)
+    board = store["leaderboard"]
+    board.insert(bisect.bisect_left(board, entry), entry)
+
+def leaderboard_remove(store, ownerNode, size=None):
+    """
+    Remove an owner from the leaderboard. size is the pokedex size it was filed
+    under, if that differs from its current size.
+    """
+    if size is None:
+        size = pokedex_size(ownerNode.pokedex)
+    board = store["leaderboard"]
+    i = bisect.bisect_left(board, (size, ownerNode.owner.lower()))
+    if i < len(board) and board[i][2] == ownerNode.owner:
+        del board[i]
+
+def leaderboard_resize(store, ownerNode, oldSize):
+    """
+    Re-file an owner whose pokedex size changed from oldSize.
+    """
+    if pokedex_size(ownerNode.pokedex) != oldSize:
+        leaderboard_remove(store, ownerNode, oldSize)
+        leaderboard_add(store, ownerNode)
+
+def leaderboard_owners(store):
+    """
+    Return all owner nodes sorted by (#pokedex size, then alpha).
+    """
+    return [find_owner_bst(store["root"], entry[2]) for entry in store["leaderboard"]]
+
+def leaderboard_top(store, k):
+    """
+    Return the k owners with the most Pokemon, most first.
+    """
+    board = store["leaderboard"]
+    return [find_owner_bst(store["root"], entry[2]) for entry in reversed(board[max(len(board) - k, 0):])]
+
+def leaderboard_rank(store, ownerName):
+    """
+    Return an owner's rank (1 = most Pokemon, same order as leaderboard_top), or None if missing.
+    """
+    ownerNode = find_owner_bst(store["root"], ownerName)
+    if ownerNode is None:
+        return None
+    board = store["leaderboard"]
+    return len(board) - bisect.bisect_left(board, leaderboard_key(ownerNode))
+
+def sorted_owner_lines(ownerStore):
+    """
+    Yield the "Display owners by number of Pokemon" report, straight from the leaderboard.
+    """
+    if ownerStore["size"] == 0:
+        yield "No owners at all."
+        return
+    yield "=== The Owners we have, sorted by number of Pokemons ==="
+    for size, _, ownerName in ownerStore["leaderboard"]:
+        yield f"Owner: {ownerName} (has {size} Pokemon)"
+
+def sort_owners_by_num_pokemon(ownerStore):
+    """
+    Print owners sorted by (#pokedex size, then alpha).
+    """
+    write_lines(sorted_owner_lines(ownerStore))
+
+########################
+# 6) Print All
+########################
+
+def print_all_owners(ownerRoot,numOfOwners):
+    """
+    Let user pick BFS, Pre, In, or Post. Print each owner's data/pokedex accordingly.
+    """
+    if numOfOwners == 0:
+        print("No owners at all")
+        return
+    print("1) BFS\n2) Pre-Order\n3) In-Order\n4) Post-Order")
+    choice = read_int_safe("Your choice:\n")
+    if choice == 1:
+        bfs_traversal(ownerRoot)
+    elif choice == 2:
+        pre_order_print(ownerRoot)
+    elif choice == 3:
+        in_order_print(ownerRoot)
+    elif choice == 4:
+        post_order_print(ownerRoot)
     else:
-        # Node found: Handle the deletion cases
+        print("Invalid choice.")
+# Output is written in chunks of this many lines
+RENDER_CHUNK_LINES = 4096
 
-        # Case 1: No children
-        if root["left"] is None and root["right"] is None:
-            return None
+def render_owner_lines(nodes):
+    """
+    Yield the "Owner: X" line and the Pokemon lines of each owner node.
+    Each species' line is formatted once and then reused from the catalog's line cache.
+    """
+    catalog = get_hoenn_catalog()
+    lineCache = catalog["lines"]
+    for node in nodes:
+        yield f"Owner: {node.owner}"
+        for poke_id in node.pokedex:
+            line = lineCache.get(poke_id)
+            if line is None:
+                line = lineCache[poke_id] = format_pokemon(catalog["by_id"][poke_id])
+            yield line
 
-        # Case 2: Only right child
-        if root["left"] is None:
-            return root["right"]
+def write_lines(lines, outStream=None):
+    """
+    Write lines to outStream (stdout by default) in chunks of RENDER_CHUNK_LINES.
+    """
+    if outStream is None:
+        outStream = sys.stdout
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= RENDER_CHUNK_LINES:
+            chunk.append("")
+            outStream.write("\n".join(chunk))
+            chunk.clear()
+    if chunk:
+        chunk.append("")
+        outStream.write("\n".join(chunk))
+    outStream.flush()
 
-        # Case 3: Only left child
-        if root["right"] is None:
-            return root["left"]
+def bfs_traversal(root):
+    """
+    Print each owner's name and pokedex in BFS order.
+    """
+    write_lines(render_owner_lines(iter_bfs(root)))
+
+def pre_order_print(root):
+    """
+    Helper to print data in pre-order.
+    """
+    write_lines(render_owner_lines(iter_pre_order(root)))
+
+def in_order_print(root):
+    """
+    Helper to print data in in-order.
+    """
+    write_lines(render_owner_lines(iter_in_order(root)))
+
+def post_order_print(root):
+    """
+    Helper to print data in post-order.
+    """
+    write_lines(render_owner_lines(iter_post_order(root)))
 
-        # Case 4: Node has two children
-        successor = min_node(root["right"])  # Find the smallest node in the right subtree
-        root["owner"] = successor["owner"]  # Copy successor's data
-        root["right"] = delete_owner_bst(root["right"], successor["owner"])  # Delete the successor
 
-    return root
 
 ########################
-# 3) BST Traversals
+# 7) Columnar Filter Engine
 ########################
 
-def bfs_traversal(root,numOfOwners):
+def load_numpy():
+    """
+    Import NumPy into the module global np the first time it is needed, if installed.
+    """
+    global np, _numpyChecked
+    if not _numpyChecked:
+        _numpyChecked = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = None
+
+def build_species_columns(catalog):
+    """
+    Build a columnar view of the catalog and return a dict:
+      { "ID", "HP", "Attack": int columns,
+        "Type": int category codes, "Can Evolve": bool column,
+        "type_codes": { casefolded type: code },
+        "row_of_id": { ID: row }, "records": [dicts, by row] }
+    Columns are NumPy arrays when NumPy is installed, plain lists otherwise;
+    with NumPy, "row_of_id" is an array indexed by ID (-1 for unused IDs).
+    """
+    load_numpy()
+    records = catalog["records"]
+    type_codes = {}
+    for d in records:
+        type_codes.setdefault(d["Type"].casefold(), len(type_codes))
+    columns = {
+        "ID": [d["ID"] for d in records],
+        "HP": [d["HP"] for d in records],
+        "Attack": [d["Attack"] for d in records],
+        "Type": [type_codes[d["Type"].casefold()] for d in records],
+        "Can Evolve": [d["Can Evolve"] == "TRUE" for d in records]
+    }
+    if np is not None:
+        for key in ("ID", "HP", "Attack", "Type"):
+            columns[key] = np.array(columns[key], dtype=np.int32)
+        columns["Can Evolve"] = np.array(columns["Can Evolve"], dtype=bool)
+    columns["type_codes"] = type_codes
+    columns["row_of_id"] = {d["ID"]: row for row, d in enumerate(records)}
+    if np is not None:
+        row_of_id = np.full(max(columns["row_of_id"], default=0) + 1, -1, dtype=np.intp)
+        row_of_id[list(columns["row_of_id"])] = list(columns["row_of_id"].values())
+        columns["row_of_id"] = row_of_id
+    columns["records"] = records
+    return columns
+
+def pokedex_rows(columns, pokedex):
+    """
+    Return the catalog rows of a pokedex, in pokedex order.
+    """
+    row_of_id = columns["row_of_id"]
+    if np is None:
+        return [row_of_id[poke_id] for poke_id in pokedex]
+    return row_of_id[np.frombuffer(pokedex, dtype=np.uint16)]
+
+def owners_rows(columns, owners):
     """
-    BFS level-order traversal. Print each owner's name and # of pokemons.
+    Concatenate the pokedex rows of several owner nodes.
+    Return (rows, owner_of_row), where owner_of_row[i] indexes into owners.
     """
-    queue = []
-    rootNum = 0
-    queue.append(root)
-    for i in range(numOfOwners):
-        counter = 0
-        if queue[rootNum].get("left") != None:
-            queue.append(queue[rootNum].get("left"))
-            counter += 1
-        if queue[rootNum].get("right") != None:
-            queue.append(queue[rootNum].get("right"))
-            counter += 1
-        rootNum += counter
-    for j in range(numOfOwners):
-        pokedex = queue[j].get("pokedex")
-        print(f'Owner: {queue[j].get("owner")}')
-        print_owner(pokedex)
+    ids = array.array("H")
+    sizes = []
+    for node in owners:
+        ids.extend(node.pokedex)
+        sizes.append(pokedex_size(node.pokedex))
+    if np is not None:
+        rows = columns["row_of_id"][np.frombuffer(ids, dtype=np.uint16)]
+        return rows, np.repeat(np.arange(len(sizes), dtype=np.intp), sizes)
+    row_of_id = columns["row_of_id"]
+    owner_of_row = []
+    for i, size in enumerate(sizes):
+        owner_of_row.extend([i] * size)
+    return [row_of_id[poke_id] for poke_id in ids], owner_of_row
 
-def pre_order(root):
+def mask_all(columns):
     """
-    Pre-order traversal (root -> left -> right). Print data for each node.
+    Species mask that keeps every row.
     """
-    pass
+    if np is None:
+        return [True] * len(columns["records"])
+    return np.ones(len(columns["records"]), dtype=bool)
 
-def in_order(root):
+def mask_type(columns, wantedType):
     """
-    In-order traversal (left -> root -> right). Print data for each node.
+    Species mask: Type equals wantedType (case-insensitive).
     """
-    pass
+    code = columns["type_codes"].get(wantedType.casefold(), -1)
+    if np is None:
+        return [t == code for t in columns["Type"]]
+    return columns["Type"] == code
 
-def post_order(root):
+def mask_can_evolve(columns):
     """
-    Post-order traversal (left -> right -> root). Print data for each node.
+    Species mask: Can Evolve is TRUE.
     """
-    pass
+    if np is None:
+        return list(columns["Can Evolve"])
+    return columns["Can Evolve"].copy()
 
-
-########################
-# 4) Pokedex Operations
-########################
-
-def add_pokemon_to_owner(ownerNode,newPokemon):
+def mask_attack_above(columns, threshold):
     """
-    Prompt user for a Pokemon ID, find the data, and add to this owner's pokedex if not duplicate.
+    Species mask: Attack strictly above threshold.
     """
-    newPokedex = ownerNode.get("pokedex")
-    newPokedex.append(newPokemon)
-    ownerNode.update({"pokedex": newPokedex})
-    return  ownerNode
+    if np is None:
+        return [a > threshold for a in columns["Attack"]]
+    return columns["Attack"] > threshold
 
-def release_pokemon_by_name(ownerNode):
+def mask_hp_above(columns, threshold):
     """
-    Prompt user for a Pokemon name, remove it from this owner's pokedex if found.
+    Species mask: HP strictly above threshold.
     """
-    numOfPokemons = len(ownerNode.get("pokedex"))
-    nameToDelete = input("Enter Pokemon Name to release: ").lower()
-    i = 0
-    for i in range(numOfPokemons):
-        currentName = ownerNode.get("pokedex")[i].get("Name").lower()
-        if nameToDelete == currentName:
-            print(f'Releasing {ownerNode.get("pokedex")[i].get("Name")} from {ownerNode.get("owner")}.')
-            ownerNode.get("pokedex").remove(ownerNode.get("pokedex")[i])
-            return
-    print(f"No Pokemon named '{nameToDelete}' in {ownerNode['owner']}\'s Pokedex.")
-    return
-def evolve_pokemon_by_name(ownerNode):
+    if np is None:
+        return [hp > threshold for hp in columns["HP"]]
+    return columns["HP"] > threshold
+
+def mask_name_prefix(columns, catalog, prefix):
     """
-    Evolve a Pokemon by name:
-    1) Check if it can evolve
-    2) Remove old
-    3) Insert new
-    4) If new is a duplicate, remove it immediately
+    Species mask: name starts with prefix (case-insensitive), via the catalog's prefix index.
     """
-    pokedex = ownerNode.get("pokedex")
-    oldPokemonName = input("Enter Pokemon Name to evolve: ")
-    oldPokemon = get_poke_dict_by_name(oldPokemonName)
-    if oldPokemon is None:
-        print(f"No Pokemon named '{oldPokemonName}' in {ownerNode.get('owner')}'s Pokedex.")
-        return
-    if oldPokemon.get("Can Evolve") == "FALSE":
-        print(f"{oldPokemon['Name']} cannot evolve.")
-        return
-    newPokemonId = oldPokemon.get("ID") + 1
-    numOfPokemons = len(pokedex)
-    for j in range(numOfPokemons):
-        name = ownerNode["pokedex"][j]["Name"]
-        if ownerNode["pokedex"][j]["Name"].lower() == oldPokemonName.lower():
-            break
-    for i in range(numOfPokemons):
-        newPokemon = pokedex[i]
-        if newPokemonId == newPokemon.get("ID"):
-            print(f"Pokemon evolved from {oldPokemon.get('Name')} (ID {oldPokemon.get('ID')}) to"
-                  f" {newPokemon.get('Name')} (ID {newPokemonId})."
-                  f"\n {newPokemon.get('Name')} was already present; releasing it immediately.")
-            pokedex.remove(pokedex[j])
-            return
-    newPokemon = get_poke_dict_by_id(newPokemonId)
-    print(f"Pokemon evolved from {pokedex[j]['Name']} (ID {pokedex[j]['ID']}) to {newPokemon['Name']} (ID {newPokemonId}).")
-    pokedex.remove(pokedex[j])
-    pokedex.append(newPokemon)
-
-########################
-# 5) Sorting Owners by # of Pokemon
-########################
+    mask = [False] * len(columns["records"])
+    for d in catalog_prefix_search(catalog, prefix):
+        mask[columns["row_of_id"][d["ID"]]] = True
+    if np is None:
+        return mask
+    return np.array(mask, dtype=bool)
 
-def gather_all_owners(root, arr):
+def mask_and(first, *others):
     """
-    Collect all BST nodes into a list (arr).
+    Combine species masks with AND, e.g. mask_and(mask_type(c, "Fire"), mask_attack_above(c, 80)).
     """
-    pass
+    if np is None:
+        return [all(flags) for flags in zip(first, *others)]
+    result = first.copy()
+    for mask in others:
+        result &= mask
+    return result
 
-def sort_owners_by_num_pokemon(root,numOfOwners):
+def mask_or(first, *others):
     """
-    Gather owners, sort them by (#pokedex size, then alpha), print results.
+    Combine species masks with OR.
     """
-    if numOfOwners == 0:
-        print("No owners at all.")
-        return
-    print("=== The Owners we have, sorted by number of Pokemons ===")
-    queue = []
-    rootNum = 0
-    queue.append(root)
-    for i in range(numOfOwners):
-        counter = 0
-        if queue[rootNum].get("left") != None:
-            queue.append(queue[rootNum].get("left"))
-            counter += 1
-        if queue[rootNum].get("right") != None:
-            queue.append(queue[rootNum].get("right"))
-            counter += 1
-        rootNum += counter
-    for i in range(numOfOwners):
-        for j in range(numOfOwners-1):
-            if len(queue[j].get("pokedex")) > len(queue[j+1].get("pokedex")):
-                queue[j],queue[j+1] = queue[j+1],queue[j]
-            elif (len(queue[j].get("pokedex")) == len(queue[j+1].get("pokedex"))
-                  and (queue[j].get("owner").lower()) > (queue[j+1].get("owner")).lower()):
-                queue[j], queue[j + 1] = queue[j + 1], queue[j]
-    for h in range(numOfOwners):
-        length = len(queue[h].get("pokedex"))
-        print(f"Owner: {queue[h].get('owner')} (has {length} Pokemon)")
-    return
-########################
-# 6) Print All
-########################
+    if np is None:
+        return [any(flags) for flags in zip(first, *others)]
+    result = first.copy()
+    for mask in others:
+        result |= mask
+    return result
 
-def print_all_owners(ownerRoot,numOfOwners):
+def select_rows(rows, speciesMask):
     """
-    Let user pick BFS, Pre, In, or Post. Print each owner's data/pokedex accordingly.
+    Return the positions in rows whose species passes speciesMask.
     """
-    if numOfOwners == 0:
-        print("No owners at all")
-        return
-    print("1) BFS\n2) Pre-Order\n3) In-Order\n4) Post-Order")
-    choice = read_int_safe("Your choice:\n")
-    if choice == 1:
-        bfs_traversal(ownerRoot,numOfOwners)
-    elif choice == 2:
-        pre_order_print(ownerRoot)
-    elif choice == 3:
-        in_order_print(ownerRoot)
-    elif choice == 4:
-        post_order_print(ownerRoot)
-    else:
-        print("Invalid choice.")
-def pre_order_print(root):
+    if np is None:
+        return [i for i, row in enumerate(rows) if speciesMask[row]]
+    return np.flatnonzero(speciesMask[rows])
+
+def filter_pokedex(columns, pokedex, speciesMask, rows=None):
     """
-    Helper to print data in pre-order.
+    Return the Pokemon dicts of a pokedex that pass speciesMask, in pokedex order.
     """
-    if root is None:
-        return
-    pokedex = root.get("pokedex")
-    print(f"Owner: {root.get('owner')}")
-    print_owner(pokedex)
-    pre_order_print(root.get("left"))
-    pre_order_print(root.get("right"))
+    if rows is None:
+        rows = pokedex_rows(columns, pokedex)
+    pokeList = pokedex_list(pokedex)
+    return [pokeList[i] for i in select_rows(rows, speciesMask)]
 
-def in_order_print(root):
+def filter_all_owners(columns, root, speciesMask):
     """
-    Helper to print data in in-order.
+    Apply speciesMask to every owner at once.
+    Return a list of (owner node, [matching Pokemon dicts]) for owners with matches, in name order.
     """
-    if root is None:
-        return
-    in_order_print(root.get("left"))
-    pokedex = root.get("pokedex")
-    print(f"Owner: {root.get('owner')}")
-    print_owner(pokedex)
-    in_order_print(root.get("right"))
+    owners = gather_all_owners(root, [])
+    rows, owner_of_row = owners_rows(columns, owners)
+    results = []
+    for i in select_rows(rows, speciesMask):
+        node = owners[owner_of_row[i]]
+        if not results or results[-1][0] is not node:
+            results.append((node, []))
+        results[-1][1].append(columns["records"][rows[i]])
+    return results
 
-def post_order_print(root):
+def count_all_owners(columns, root, speciesMask):
     """
-    Helper to print data in post-order.
+    Count the pokedex entries of all owners that pass speciesMask.
     """
-
-    if root is None:
-        return
-    post_order_print(root.get("left"))
-    post_order_print(root.get("right"))
-    pokedex = root.get("pokedex")
-    print(f"Owner: {root.get('owner')}")
-    print_owner(pokedex)
-
+    rows, owner_of_row = owners_rows(columns, gather_all_owners(root, []))
+    return len(select_rows(rows, speciesMask))
 
 
 ########################
-# 7) The Display Filter Sub-Menu
+# 8) The Display Filter Sub-Menu
 ########################
 
 def display_filter_sub_menu(ownerNode):
@@ -425,93 +1886,56 @@ def display_filter_sub_menu(ownerNode):
     6) All
     7) Back
     """
+    columns = get_hoenn_columns()
+    pokedex = ownerNode.pokedex
+    rows = pokedex_rows(columns, pokedex)
     choice = 1
-    i = 0
-    numOfPokemons = len(ownerNode.get("pokedex"))
-    if numOfPokemons == 0:
-        currentPokemon = None
-    else:
-        currentPokemon = ownerNode.get("pokedex")[0]
     while choice != 7:
-        printcounter = 0
         print("\n-- Display Filter Menu --\n1. Only a certain Type\n2. Only Evolvable\n3. Only Attack above __\n"
         "4. Only HP above __\n5. Only names starting with letter(s)\n6. All of them!\n7. Back")
         choice = read_int_safe("Your choice: ")
         if choice == 1:
-            if numOfPokemons != 0:
+            if pokedex_size(pokedex) == 0:
+                speciesMask = None
+            else:
                 wantedType = input("Which Type? (e.g. GRASS, WATER): ")
-                wantedType = wantedType.lower()
-                for i in range (numOfPokemons):
-                    currentPokemon = ownerNode.get("pokedex")[i]
-                    currentType = currentPokemon.get("Type")
-                    currentType = currentType.lower()
-                    if currentType == wantedType:
-                        print_pokemon(currentPokemon)
-                        printcounter += 1
-            if printcounter == 0 or numOfPokemons == 0:
-                print("There are no Pokemons in this Pokedex that match the criteria.")
+                speciesMask = mask_type(columns, wantedType)
         elif choice == 2:
-            for i in range(numOfPokemons):
-                if numOfPokemons != 0:
-                    currentPokemon = ownerNode.get("pokedex")[i]
-                    if currentPokemon.get("Can Evolve") == "TRUE":
-                        print_pokemon(currentPokemon)
-                        printcounter += 1
-            if printcounter == 0 or numOfPokemons == 0:
-                print("There are no Pokemons in this Pokedex that match the criteria.")
+            speciesMask = mask_can_evolve(columns)
         elif choice == 3:
             requiredAttack = read_int_safe("Enter Attack threshold: ")
-            for i in range(numOfPokemons):
-                if numOfPokemons != 0:
-                    currentPokemon = ownerNode.get("pokedex")[i]
-                    if currentPokemon.get("Attack") > requiredAttack:
-                        print_pokemon(currentPokemon)
-                        printcounter += 1
-            if printcounter == 0 or numOfPokemons == 0:
-                print("There are no Pokemons in this Pokedex that match the criteria.")
+            speciesMask = mask_attack_above(columns, requiredAttack)
         elif choice == 4:
             requiredHP = read_int_safe("Enter HP threshold: ")
-            for i in range(numOfPokemons):
-                if numOfPokemons != 0:
-                    currentPokemon = ownerNode.get("pokedex")[i]
-                    if currentPokemon.get("HP") > requiredHP:
-                        print_pokemon(currentPokemon)
-                        printcounter += 1
-            if printcounter == 0 or numOfPokemons == 0:
-                print("There are no Pokemons in this Pokedex that match the criteria.")
+            speciesMask = mask_hp_above(columns, requiredHP)
         elif choice == 5:
             startingLetters = input("Starting letter(s): ")
-            for i in range(numOfPokemons):
-                if numOfPokemons != 0:
-                    currentPokemon = ownerNode.get("pokedex")[i]
-                    currentName = currentPokemon.get("Name").lower()
-                    if currentName.startswith(startingLetters):
-                        print_pokemon(currentPokemon)
-                        printcounter += 1
-            if printcounter == 0 or numOfPokemons == 0:
-                print("There are no Pokemons in this Pokedex that match the criteria.")
+            speciesMask = mask_name_prefix(columns, get_hoenn_catalog(), startingLetters)
         elif choice == 6:
-            for i in range(numOfPokemons):
-                if numOfPokemons != 0:
-                    currentPokemon = ownerNode.get("pokedex")[i]
-                    print_pokemon(currentPokemon)
-                    printcounter += 1
-            if printcounter == 0 or numOfPokemons == 0:
-                print("There are no Pokemons in this Pokedex that match the criteria.")
+            speciesMask = mask_all(columns)
         elif choice == 7:
             print("Back to Pokedex Menu.\n")
             return
         else:
             print("Invalid choice.")
+            continue
+        if speciesMask is None:
+            matches = []
+        else:
+            matches = filter_pokedex(columns, pokedex, speciesMask, rows)
+        if not matches:
+            print("There are no Pokemons in this Pokedex that match the criteria.")
+        for pokemon in matches:
+            print_pokemon(pokemon)
 
 
 
 
 ########################
-# 8) Sub-menu & Main menu
+# 9) Sub-menu & Main menu
 ########################
 
-def existing_pokedex(ownerRoot):
+def existing_pokedex(ownerStore):
     """
     Ask user for an owner name, locate the BST node, then show sub-menu:
     - Add Pokemon
@@ -520,50 +1944,41 @@ def existing_pokedex(ownerRoot):
     - Evolve
     - Back
     """
-    if ownerRoot is None:
+    if ownerStore["root"] is None:
         print("No owners at all")
         return
     ownerName = input("Owner name: ")
-    currentOwner = find_owner_bst(ownerRoot,ownerName)
+    currentOwner = find_owner_bst(ownerStore["root"], ownerName)
     if currentOwner is None:
         print(f"Owner '{ownerName}' not found.")
         return
     choice = 1
     while choice != 5:
-        print(f"\n-- {currentOwner['owner']}\'s Pokedex Menu --\n1. Add Pokemon\n2. Display Pokedex\n3. Release Pokemon\n"
+        print(f"\n-- {currentOwner.owner}\'s Pokedex Menu --\n1. Add Pokemon\n2. Display Pokedex\n3. Release Pokemon\n"
               "4. Evolve Pokemon\n5. Back to Main")
         choice = read_int_safe("Your choice: ")
         if choice == 1:
-            newPokemon2 = None
-            numOfPokemons = len(currentOwner["pokedex"])
             id = read_int_safe("Enter Pokemon ID to add: ")
-            if id < 1 or id > 135:
-                print(f"ID {id} not found in Honen data.")
-                continue
+            newPokemon = get_poke_dict_by_id(id)
+            if newPokemon is None:
+                print(f"ID {id} not found in the species catalog.")
+            elif add_pokemon_to_owner(ownerStore, currentOwner, newPokemon):
+                print(f'Pokemon {newPokemon.get("Name")} (ID {id}) added to {currentOwner.owner}\'s Pokedex.')
             else:
-                newPokemon = get_poke_dict_by_id(id)
-                for i in range(numOfPokemons):
-                    if id == currentOwner["pokedex"][i]["ID"]:
-                        print("Pokemon already in the list. No changes made.")
-                        newPokemon2 = currentOwner["pokedex"][i]
-                        continue
-                if newPokemon2 is None:
-                    add_pokemon_to_owner(currentOwner, newPokemon)
-                    print(f'Pokemon {newPokemon.get("Name")} (ID {id}) added to {currentOwner["owner"]}\'s Pokedex.')
-                    continue
+                print("Pokemon already in the list. No changes made.")
         elif choice == 2:
             display_filter_sub_menu(currentOwner)
         elif choice == 3:
-            release_pokemon_by_name(currentOwner)
+            release_pokemon_by_name(ownerStore, currentOwner)
         elif choice == 4:
-            evolve_pokemon_by_name(currentOwner)
+            evolve_pokemon_by_name(ownerStore, currentOwner)
         elif choice == 5:
             print("Back to Main Menu.\n")
             return
         else:
             print("Invalid choice.")
 
-def main_menu():
+def main_menu(ownerStore=None):
     """
     Main menu for:
     1) New Pokedex
@@ -573,61 +1988,46 @@ def main_menu():
     5) Print all
     6) Exit
     """
-    numOfOwners = 0
+    if ownerStore is None:
+        ownerStore = create_owner_store()
     choice = 1
     while choice != 6:
         print("=== Main Menu ===\n1. New Pokedex\n2. Existing Pokedex\n3. Delete a Pokedex\n"
           "4. Display owners by number of Pokemon\n5. Print All\n6. Exit")
         choice = read_int_safe("Your choice: ")
-        if numOfOwners == 0:
-            ownerRoot = None
         if choice == 1:
             ownerName = input('Owner name: ')
-            if  numOfOwners != 0 and find_owner_bst(ownerRoot,ownerName) != None:
+            if find_owner_bst(ownerStore["root"], ownerName) is not None:
                 print(f"Owner '{ownerName}' already exists. No new Pokedex created.\n")
                 continue
-            print("Choose your starter Pokemon:\n1) Treecko\n2) Torchic\n3) Mudkip")
+            starters = get_starters()
+            print("Choose your starter Pokemon:\n" +
+                  "\n".join(f"{i}) {starter['Name']}" for i, starter in enumerate(starters, 1)))
             chosenPokemon = read_int_safe("Your choice: ")
-            if chosenPokemon == 1:
-                firstPokemon = get_poke_dict_by_id(1)
-                print(f'New Pokedex created for {ownerName} with starter {firstPokemon.get("Name")}.')
-            elif chosenPokemon == 2:
-                firstPokemon = get_poke_dict_by_id(4)
-                print(f'New Pokedex created for {ownerName} with starter {firstPokemon.get("Name")}.')
-            elif chosenPokemon == 3:
-                firstPokemon = get_poke_dict_by_id(7)
-                print(f'New Pokedex created for {ownerName} with starter {firstPokemon["Name"]}.')
-            else:
+            if not 1 <= chosenPokemon <= len(starters):
                 print("Invalid. No new Pokedex created.")
                 continue
+            firstPokemon = starters[chosenPokemon - 1]
+            print(f'New Pokedex created for {ownerName} with starter {firstPokemon["Name"]}.')
             newOwner = create_owner_node(ownerName, firstPokemon)
-            if numOfOwners == 0:
-                ownerRoot = newOwner
-                numOfOwners += 1
-            else:
-                if(insert_owner_bst(ownerRoot,newOwner) == True):
-                    numOfOwners += 1
+            insert_owner_bst(ownerStore, newOwner)
         elif choice == 2:
-            existing_pokedex(ownerRoot)
+            existing_pokedex(ownerStore)
         elif choice == 3:
-            if ownerRoot is None:
+            if ownerStore["root"] is None:
                 print("No owner at all")
                 continue
             ownerName = input("Enter owner to delete: ").lower()
-            oldOwner = find_owner_bst(ownerRoot,ownerName)
+            oldOwner = delete_owner_bst(ownerStore, ownerName)
             if oldOwner is None:
                 print(f"Owner '{ownerName}' not found.")
                 continue
-            print(f"Deleting {oldOwner['owner']}'s entire Pokedex...\n")
+            print(f"Deleting {oldOwner.owner}'s entire Pokedex...\n")
             print("Pokedex deleted.\n")
-            newOwnerRoot = delete_owner_bst(ownerRoot,ownerName)
-            if oldOwner is ownerRoot:
-                ownerRoot = newOwnerRoot
-            numOfOwners -= 1
         elif choice == 4:
-            sort_owners_by_num_pokemon(ownerRoot,numOfOwners)
+            sort_owners_by_num_pokemon(ownerStore)
         elif choice == 5:
-            print_all_owners(ownerRoot,numOfOwners)
+            print_all_owners(ownerStore["root"], ownerStore["size"])
         elif choice == 6:
             print("Goodbye!")
             choice = 6
@@ -636,12 +2036,974 @@ def main_menu():
             print("Invalid choice.")
 
 
+########################
+# 10) Batch Mode
+########################
+
+# Result lines are written out in chunks of this many
+BATCH_FLUSH_LINES = 8192
+
+PRINT_ORDERS = {"bfs": iter_bfs, "pre": iter_pre_order, "in": iter_in_order, "post": iter_post_order}
+# Command keys that must hold strings (the owners range keys may also be null)
+BATCH_TEXT_FIELDS = ("op", "owner", "name", "type", "prefix", "path", "before")
+BATCH_RANGE_FIELDS = ("from", "to", "after")
+
+def parse_batch_command(line):
+    """
+    Parse one batch line: a JSON object with an "op" key, e.g.
+      {"op": "add", "owner": "Ash", "id": 25}
+    Return the dict, or None for blank lines and '#' comments.
+    Raise ValueError if it is not such an object or a text key holds something else.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    command = json.loads(line)
+    if not isinstance(command, dict) or "op" not in command:
+        raise ValueError('expected a JSON object with an "op" key')
+    for key in BATCH_TEXT_FIELDS:
+        if key in command and not isinstance(command[key], str):
+            raise ValueError(f'"{key}" must be a string')
+    if command["op"] == "owners":
+        for key in BATCH_RANGE_FIELDS:
+            if command.get(key) is not None and not isinstance(command[key], str):
+                raise ValueError(f'"{key}" must be a string or null')
+    return command
+
+def batch_species_mask(command):
+    """
+    Build a species mask from a filter command's optional keys:
+    "type", "can_evolve", "attack_above", "hp_above", "prefix" (all ANDed together).
+    """
+    columns = get_hoenn_columns()
+    masks = [mask_all(columns)]
+    if "type" in command:
+        masks.append(mask_type(columns, command["type"]))
+    if command.get("can_evolve"):
+        masks.append(mask_can_evolve(columns))
+    if "attack_above" in command:
+        masks.append(mask_attack_above(columns, int(command["attack_above"])))
+    if "hp_above" in command:
+        masks.append(mask_hp_above(columns, int(command["hp_above"])))
+    if "prefix" in command:
+        masks.append(mask_name_prefix(columns, get_hoenn_catalog(), command["prefix"]))
+    return mask_and(*masks)
+
+def batch_owner_range(command):
+    """
+    Return the (low, high) owner name bounds of an owners command:
+    everything starting with "prefix", or "from"/"to" (either may be missing).
+    """
+    if "prefix" in command:
+        prefix = command["prefix"].lower()
+        return prefix, prefix + chr(0x10FFFF)
+    return command.get("from"), command.get("to")
+
+def apply_batch_command(ownerStore, command, out):
+    """
+    Apply one parsed command to the owner store, appending result lines to out.
+    Ops: new, add, release, evolve (optional "to": branch ID), evolve_all (one owner
+    or everyone, optional "fully"), delete, sort, print, filter, count (filter keys,
+    answered from the cross-owner index), import ("path" of a .csv/.jsonl file),
+    owners (a page of owners by "prefix" or "from"/"to", resumed with "after": the
+    previous cursor), savepoint / rollback ("name": keep the current tree, or go back to it),
+    stats (totals and Pokemon per type; with "owner", that owner's HP/Attack sums;
+    with "before", how many owners sort before that name), suggest (species names
+    close to "name"; with "owner", only that owner's Pokemon).
+    """
+    op = command["op"]
+    if op in ("add", "release", "evolve", "delete") or (op in ("filter", "evolve_all") and "owner" in command):
+        ownerNode = find_owner_bst(ownerStore["root"], command["owner"])
+        if ownerNode is None:
+            out.append(f"Owner '{command['owner']}' not found.")
+            return
+    if op == "new":
+        ownerName = command["owner"]
+        starters = get_starters()
+        chosenPokemon = int(command.get("starter", 1))
+        firstPokemon = starters[chosenPokemon - 1] if 1 <= chosenPokemon <= len(starters) else None
+        if firstPokemon is None:
+            out.append("Invalid. No new Pokedex created.")
+        elif not insert_owner_bst(ownerStore, create_owner_node(ownerName, firstPokemon)):
+            out.append(f"Owner '{ownerName}' already exists. No new Pokedex created.")
+        else:
+            out.append(f'New Pokedex created for {ownerName} with starter {firstPokemon["Name"]}.')
+    elif op == "add":
+        newPokemon = get_poke_dict_by_id(int(command["id"]))
+        if newPokemon is None:
+            out.append(f"ID {command['id']} not found in the species catalog.")
+        elif add_pokemon_to_owner(ownerStore, ownerNode, newPokemon):
+            out.append(f'Pokemon {newPokemon["Name"]} (ID {newPokemon["ID"]}) added to {ownerNode.owner}\'s Pokedex.')
+        else:
+            out.append("Pokemon already in the list. No changes made.")
+    elif op == "release":
+        pokemon = release_pokemon(ownerStore, ownerNode, command["name"])
+        if pokemon is None:
+            out.append(f"No Pokemon named '{command['name']}' in {ownerNode.owner}'s Pokedex.")
+        else:
+            out.append(f'Releasing {pokemon["Name"]} from {ownerNode.owner}.')
+    elif op == "evolve":
+        targetId = int(command["to"]) if "to" in command else None
+        result = evolve_pokemon(ownerStore, ownerNode, command["name"], targetId)
+        out.append(evolve_message(ownerNode, command["name"], *result))
+    elif op == "evolve_all":
+        fully = bool(command.get("fully"))
+        if "owner" in command:
+            count = len(evolve_owner(ownerStore, ownerNode, fully))
+            out.append(f"{count} Pokemon evolved in {ownerNode.owner}'s Pokedex.")
+        else:
+            out.append(f"{evolve_all_owners(ownerStore, fully)} Pokemon evolved across all owners.")
+    elif op == "delete":
+        delete_owner_bst(ownerStore, command["owner"])
+        out.append(f"Deleting {ownerNode.owner}'s entire Pokedex...")
+    elif op == "sort":
+        out.extend(sorted_owner_lines(ownerStore))
+    elif op == "print":
+        order = command.get("order", "in")
+        if order not in PRINT_ORDERS:
+            raise ValueError(f"unknown print order '{order}'")
+        if ownerStore["size"] == 0:
+            out.append("No owners at all")
+        else:
+            out.extend(render_owner_lines(PRINT_ORDERS[order](ownerStore["root"])))
+    elif op == "owners":
+        low, high = batch_owner_range(command)
+        nodes, cursor = owner_page(ownerStore["root"], int(command.get("limit", 50)),
+                                   command.get("after"), low, high)
+        out.extend(f"Owner: {node.owner} (has {pokedex_size(node.pokedex)} Pokemon)" for node in nodes)
+        out.append(f"Next cursor: {json.dumps(cursor)}")
+    elif op == "filter":
+        speciesMask = batch_species_mask(command)
+        columns = get_hoenn_columns()
+        if "owner" in command:
+            matches = filter_pokedex(columns, ownerNode.pokedex, speciesMask)
+            if not matches:
+                out.append("There are no Pokemons in this Pokedex that match the criteria.")
+            out.extend(format_pokemon(pokemon) for pokemon in matches)
+        else:
+            results = query_owners(ownerStore, columns, speciesMask)
+            if not results:
+                out.append("There are no Pokemons in any Pokedex that match the criteria.")
+            for matchNode, matches in results:
+                out.append(f"Owner: {matchNode.owner}")
+                out.extend(format_pokemon(pokemon) for pokemon in matches)
+    elif op == "import":
+        try:
+            numOfOwners, numOfAdded = import_owners(ownerStore, command["path"])
+        except OSError as e:
+            out.append(f"Could not import {command['path']}: {e.strerror}.")
+            return
+        out.append(f"Imported {numOfOwners} new owners; added {numOfAdded} Pokemon to existing owners.")
+    elif op == "count":
+        numOfEntries, numOfOwners = query_count(ownerStore, get_hoenn_columns(), batch_species_mask(command))
+        out.append(f"{numOfEntries} Pokemon across {numOfOwners} owners match the criteria.")
+    elif op == "stats":
+        out.extend(stats_lines(ownerStore, command))
+    elif op == "suggest":
+        pokedex = None
+        if "owner" in command:
+            ownerNode = find_owner_bst(ownerStore["root"], command["owner"])
+            if ownerNode is None:
+                out.append(f"Owner '{command['owner']}' not found.")
+                return
+            pokedex = ownerNode.pokedex
+        suggestions = suggest_pokemon(command["name"], pokedex, int(command.get("limit", FUZZY_MAX_SUGGESTIONS)))
+        if not suggestions:
+            out.append(f"No Pokemon names close to '{command['name']}'.")
+        out.extend(format_pokemon(pokemon) for pokemon in suggestions)
+    elif op == "savepoint":
+        ownerStore.setdefault("savepoints", {})[command["name"]] = snapshot_owner_tree(ownerStore)
+        out.append(f"Savepoint '{command['name']}' set ({ownerStore['size']} owners).")
+    elif op == "rollback":
+        snapshot = ownerStore.get("savepoints", {}).get(command["name"])
+        if snapshot is None:
+            out.append(f"No savepoint named '{command['name']}'.")
+            return
+        rollback_owner_store(ownerStore, snapshot)
+        out.append(f"Rolled back to savepoint '{command['name']}' ({ownerStore['size']} owners).")
+    else:
+        raise ValueError(f"unknown op '{op}'")
+
+def stats_lines(ownerStore, command):
+    """
+    Return the result lines of a batch "stats" command, all answered from the
+    tree's cached aggregates.
+    """
+    if "owner" in command:
+        ownerNode = find_owner_bst(ownerStore["root"], command["owner"])
+        if ownerNode is None:
+            return [f"Owner '{command['owner']}' not found."]
+        stats = owner_stats(ownerNode)
+        if not stats["pokemon"]:
+            return [f"{ownerNode.owner} has no Pokemon."]
+        return [f"{ownerNode.owner}: {stats['pokemon']} Pokemon, HP {stats['hp']} (avg {stats['avg_hp']:.1f}),"
+                f" Attack {stats['attack']} (avg {stats['avg_attack']:.1f})"]
+    if "before" in command:
+        return [f"{owner_name_rank(ownerStore['root'], command['before'])} owners sort before '{command['before']}'."]
+    return population_lines(population_stats(ownerStore["root"]))
+
+def population_lines(stats):
+    """
+    Format a population_stats() result: the totals, then Pokemon per type.
+    """
+    lines = [f"{stats['owners']} owners hold {stats['pokemon']} Pokemon."]
+    lines.extend(f"{pokeType}: {count}" for pokeType, count in sorted(stats["types"].items()))
+    return lines
+
+def run_batch(inStream, outStream, ownerStore=None, applyCommand=None):
+    """
+    Apply every command read from inStream to the owner store (a new one by default),
+    writing results to outStream in large chunks. Bad lines are reported and skipped.
+    applyCommand(ownerStore, command, out) applies one command (apply_batch_command
+    by default; another store kind, such as a sharded one, brings its own).
+    Return the owner store.
+    """
+    if ownerStore is None:
+        ownerStore = create_owner_store()
+    if applyCommand is None:
+        applyCommand = apply_batch_command
+    out = []
+    try:
+        for lineNumber, line in enumerate(inStream, 1):
+            try:
+                command = parse_batch_command(line)
+                if command is not None:
+                    applyCommand(ownerStore, command, out)
+            except KeyError as e:
+                out.append(f"Line {lineNumber}: invalid command (missing {e}).")
+            except (ValueError, TypeError) as e:
+                out.append(f"Line {lineNumber}: invalid command ({e}).")
+            if len(out) >= BATCH_FLUSH_LINES:
+                outStream.write("\n".join(out) + "\n")
+                out.clear()
+    finally:
+        # Results so far are written even if a command fails unexpectedly
+        if out:
+            outStream.write("\n".join(out) + "\n")
+        outStream.flush()
+    return ownerStore
+
+
+########################
+# 11) Persistence (Journal + Snapshots)
+########################
+
+SNAPSHOT_FILE = "owners.snapshot"
+JOURNAL_FILE = "owners.journal"
+SNAPSHOT_MAGIC = b"PKDX"
+# Version 2 stores National IDs, so a data dir reopens under any catalog keying;
+# version 1 stored the catalog's own IDs.
+SNAPSHOT_VERSION = 2
+# magic, version, last journal seq included, number of owners
+SNAPSHOT_HEADER = struct.Struct("<4sHQI")
+# owner name length in bytes, pokedex size
+SNAPSHOT_OWNER = struct.Struct("<HI")
+
+def to_national_ids(pokedex):
+    """
+    Return a pokedex's species as National IDs (an array('H'), same order).
+    """
+    by_id = get_hoenn_catalog()["by_id"]
+    return array.array("H", [by_id[poke_id]["National ID"] for poke_id in pokedex])
+
+def from_national_ids(nationalIds, source):
+    """
+    Return the catalog IDs of National IDs read from source (an array('H'), same order).
+    Raise ValueError if the loaded catalog lacks one of those species.
+    """
+    by_national = get_hoenn_catalog()["by_national"]
+    ids = Pokedex("H")
+    for nationalId in nationalIds:
+        pokemon = by_national.get(nationalId)
+        if pokemon is None:
+            raise ValueError(f"{source} holds National ID {nationalId}, which the loaded species catalog lacks")
+        ids.append(pokemon["ID"])
+    return ids
+
+def write_snapshot(ownerStore, path, seq):
+    """
+    Write every owner (in name order) to a compact binary snapshot:
+    the header, then per owner its UTF-8 name and its pokedex as uint16 National IDs.
+    The file is written aside and renamed into place, so a crash never leaves half a snapshot.
+    """
+    owners = gather_all_owners(ownerStore["root"], [])
+    chunks = [SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, seq, len(owners))]
+    for ownerNode in owners:
+        name = ownerNode.owner.encode("utf-8")
+        ids = to_national_ids(ownerNode.pokedex)
+        if sys.byteorder == "big":
+            ids.byteswap()
+        chunks.append(SNAPSHOT_OWNER.pack(len(name), len(ids)))
+        chunks.append(name)
+        chunks.append(ids.tobytes())
+    tmpPath = path + ".tmp"
+    with open(tmpPath, mode='wb') as f:
+        f.write(b"".join(chunks))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmpPath, path)
+
+def read_snapshot(ownerStore, path):
+    """
+    Load a snapshot written by write_snapshot into an (empty) owner store.
+    Return the journal seq it includes, or 0 if there is no snapshot.
+    """
+    if not os.path.exists(path):
+        return 0
+    with open(path, mode='rb') as f:
+        data = f.read()
+    magic, version, seq, numOfOwners = SNAPSHOT_HEADER.unpack_from(data, 0)
+    if magic != SNAPSHOT_MAGIC or version not in (1, SNAPSHOT_VERSION):
+        raise ValueError(f"{path} is not a version {SNAPSHOT_VERSION} owner snapshot")
+    offset = SNAPSHOT_HEADER.size
+    owners = []
+    for _ in range(numOfOwners):
+        nameLength, numOfPokemons = SNAPSHOT_OWNER.unpack_from(data, offset)
+        offset += SNAPSHOT_OWNER.size
+        name = data[offset:offset + nameLength].decode("utf-8")
+        offset += nameLength
+        ids = Pokedex("H")
+        ids.frombytes(data[offset:offset + 2 * numOfPokemons])
+        offset += 2 * numOfPokemons
+        if sys.byteorder == "big":
+            ids.byteswap()
+        if version != 1:
+            ids = from_national_ids(ids, path)
+        owners.append(OwnerNode(name, ids))
+    bulk_load_owners(ownerStore, owners)
+    return seq
+
+def apply_journal_record(ownerStore, record):
+    """
+    Re-apply one journal record to the owner store.
+    """
+    op = record["op"]
+    # Records marked "national" hold National IDs; older ones hold catalog IDs
+    if record.get("national"):
+        for key in ("ids", "id", "to"):
+            if record.get(key) is not None:
+                ids = from_national_ids(record[key] if key == "ids" else [record[key]], JOURNAL_FILE)
+                record[key] = list(ids) if key == "ids" else ids[0]
+    if op == "new":
+        # Older journals stored only the first Pokemon, as "id"
+        ids = record["ids"] if "ids" in record else [record["id"]] if record["id"] is not None else []
+        ownerNode = create_owner_node(record["owner"], None)
+        ownerNode.pokedex = create_pokedex(get_poke_dict_by_id(poke_id) for poke_id in ids)
+        insert_owner_bst(ownerStore, ownerNode)
+        return
+    if op == "delete":
+        delete_owner_bst(ownerStore, record["owner"])
+        return
+    ownerNode = find_owner_bst(ownerStore["root"], record["owner"])
+    pokemon = get_poke_dict_by_id(record["id"])
+    if op == "add":
+        add_pokemon_to_owner(ownerStore, ownerNode, pokemon)
+    elif op == "release":
+        release_pokemon(ownerStore, ownerNode, pokemon["Name"])
+    elif op == "evolve":
+        evolve_pokemon(ownerStore, ownerNode, pokemon["Name"], record.get("to"))
+
+def replay_journal(ownerStore, path, afterSeq):
+    """
+    Apply the journal records with seq > afterSeq. A torn last line (a crash mid-write)
+    is cut off. Return the last seq seen.
+    """
+    seq = afterSeq
+    if not os.path.exists(path):
+        return seq
+    goodLength = 0
+    with open(path, mode='rb') as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            record = json.loads(line)
+            goodLength += len(line)
+            if record["seq"] > afterSeq:
+                apply_journal_record(ownerStore, record)
+                seq = record["seq"]
+    if goodLength != os.path.getsize(path):
+        os.truncate(path, goodLength)
+    return seq
+
+def journal_listener(journal):
+    """
+    Return a store listener that turns every change into a journal record.
+    """
+    def listener(event, ownerNode, *details):
+        record = {"op": event, "owner": ownerNode.owner, "national": True}
+        if event == "new":
+            record["ids"] = list(to_national_ids(ownerNode.pokedex))
+        elif event in ("add", "release", "evolve"):
+            record["id"] = details[0]["National ID"]
+            if event == "evolve":
+                record["to"] = details[1]["National ID"]
+        journal_append(journal, record)
+    return listener
+
+def journal_append(journal, record):
+    """
+    Queue a record. Pending records are written and fsynced together (group commit)
+    once there are syncEvery of them or syncSeconds have passed (see journal_flusher
+    for when no further record comes), and every snapshotEvery records the journal
+    is folded into a new snapshot.
+    """
+    with journal["lock"]:
+        journal["seq"] += 1
+        record["seq"] = journal["seq"]
+        if not journal["pending"]:
+            journal["pendingSince"] = time.monotonic()
+        journal["pending"].append(json.dumps(record))
+        journal["sinceSnapshot"] += 1
+        if (len(journal["pending"]) >= journal["syncEvery"]
+                or time.monotonic() - journal["lastSync"] >= journal["syncSeconds"]):
+            journal_sync(journal)
+        if journal["sinceSnapshot"] >= journal["snapshotEvery"]:
+            checkpoint_owner_store(journal)
+
+def journal_sync(journal):
+    """
+    Write and fsync all pending journal records.
+    """
+    with journal["lock"]:
+        if journal["pending"]:
+            journal["file"].write("\n".join(journal["pending"]) + "\n")
+            journal["pending"].clear()
+            journal["file"].flush()
+            os.fsync(journal["file"].fileno())
+        journal["lastSync"] = time.monotonic()
+
+def journal_flusher(journal):
+    """
+    Background thread body: sync pending records once the oldest has waited
+    syncSeconds, so the bound holds while the store sits idle after a burst.
+    Runs until journal["stop"] is set.
+    """
+    timeout = journal["syncSeconds"]
+    while not journal["stop"].wait(timeout):
+        with journal["lock"]:
+            if journal["pending"]:
+                waited = time.monotonic() - journal["pendingSince"]
+                if waited >= journal["syncSeconds"]:
+                    journal_sync(journal)
+                    waited = 0
+                timeout = journal["syncSeconds"] - waited
+            else:
+                timeout = journal["syncSeconds"]
+
+def checkpoint_owner_store(journal):
+    """
+    Snapshot the store and empty the journal, which the snapshot now covers.
+    """
+    with journal["lock"]:
+        journal_sync(journal)
+        write_snapshot(journal["store"], os.path.join(journal["dir"], SNAPSHOT_FILE), journal["seq"])
+        journal["file"].truncate(0)
+        journal["sinceSnapshot"] = 0
+
+def open_owner_store(dataDir, syncEvery=64, syncSeconds=1.0, snapshotEvery=100000):
+    """
+    Recover an owner store from dataDir (latest snapshot + journal tail) and start
+    journaling every further change to it. Close it with close_owner_store.
+    """
+    os.makedirs(dataDir, exist_ok=True)
+    ownerStore = create_owner_store()
+    seq = read_snapshot(ownerStore, os.path.join(dataDir, SNAPSHOT_FILE))
+    journalPath = os.path.join(dataDir, JOURNAL_FILE)
+    seq = replay_journal(ownerStore, journalPath, seq)
+    journal = {
+        "dir": dataDir,
+        "store": ownerStore,
+        "file": open(journalPath, mode='a', encoding='utf-8'),
+        "seq": seq,
+        "pending": [],
+        "pendingSince": 0.0,
+        "lastSync": time.monotonic(),
+        # Guards the fields above against the flusher thread
+        "lock": threading.RLock(),
+        "stop": threading.Event(),
+        "sinceSnapshot": 0,
+        "syncEvery": syncEvery,
+        "syncSeconds": syncSeconds,
+        "snapshotEvery": snapshotEvery
+    }
+    journal["flusher"] = threading.Thread(target=journal_flusher, args=(journal,),
+                                          name="journal-flush", daemon=True)
+    journal["flusher"].start()
+    ownerStore["journal"] = journal
+    ownerStore["listeners"].append(journal_listener(journal))
+    return ownerStore
+
+def close_owner_store(ownerStore):
+    """
+    Flush the journal, write a fresh snapshot and close the journal file.
+    """
+    journal = ownerStore["journal"]
+    journal["stop"].set()
+    journal["flusher"].join()
+    checkpoint_owner_store(journal)
+    journal["file"].close()
+
+
+########################
+# 12) Cross-Owner Index
+########################
+
+def create_owner_index():
+    """
+    Create and return an empty cross-owner index dict, keyed by owner name
+    (nodes are replaced on copy-on-write, names are not):
+      'species': { ID: set of owner names }
+      'types':   { casefolded type: { owner name: # of that type } }
+    """
+    return {"species": {}, "types": {}}
+
+def index_add(index, ownerNode, pokemon):
+    """
+    Record that ownerNode holds pokemon.
+    """
+    ownerName = ownerNode.owner
+    index["species"].setdefault(pokemon["ID"], set()).add(ownerName)
+    typeOwners = index["types"].setdefault(pokemon["Type"].casefold(), {})
+    typeOwners[ownerName] = typeOwners.get(ownerName, 0) + 1
+
+def index_remove(index, ownerNode, pokemon):
+    """
+    Record that ownerNode no longer holds pokemon, dropping empty buckets.
+    """
+    ownerName = ownerNode.owner
+    owners = index["species"].get(pokemon["ID"])
+    if owners is not None and ownerName in owners:
+        owners.discard(ownerName)
+        if not owners:
+            del index["species"][pokemon["ID"]]
+    pokeType = pokemon["Type"].casefold()
+    typeOwners = index["types"].get(pokeType, {})
+    count = typeOwners.get(ownerName)
+    if count is not None:
+        if count > 1:
+            typeOwners[ownerName] = count - 1
+        else:
+            del typeOwners[ownerName]
+            if not typeOwners:
+                del index["types"][pokeType]
+
+def rebuild_owner_index(index, nodes):
+    """
+    Refill an index in place (listeners hold on to the dict) from the given owner nodes.
+    """
+    index["species"].clear()
+    index["types"].clear()
+    for ownerNode in nodes:
+        for pokemon in pokedex_list(ownerNode.pokedex):
+            index_add(index, ownerNode, pokemon)
+
+def owner_index_listener(index):
+    """
+    Return a store listener that keeps the cross-owner index in step with every change.
+    """
+    def listener(event, ownerNode, *details):
+        if event == "new":
+            for pokemon in pokedex_list(ownerNode.pokedex):
+                index_add(index, ownerNode, pokemon)
+        elif event == "delete":
+            for pokemon in pokedex_list(ownerNode.pokedex):
+                index_remove(index, ownerNode, pokemon)
+        elif event == "add":
+            index_add(index, ownerNode, details[0])
+        elif event == "release":
+            index_remove(index, ownerNode, details[0])
+        elif event == "evolve":
+            oldPokemon, newPokemon, added = details
+            index_remove(index, ownerNode, oldPokemon)
+            if added:
+                index_add(index, ownerNode, newPokemon)
+    return listener
+
+def owners_of_species(ownerStore, poke_id):
+    """
+    Return the owner nodes holding the species with this ID, in name order.
+    """
+    owners = sorted(ownerStore["index"]["species"].get(poke_id, ()), key=str.lower)
+    return [find_owner_bst(ownerStore["root"], name) for name in owners]
+
+def owners_of_type(ownerStore, pokeType):
+    """
+    Return (owner node, # of Pokemon of that type) for every owner holding pokeType
+    (case-insensitive), in name order.
+    """
+    owners = ownerStore["index"]["types"].get(pokeType.casefold(), {})
+    return [(find_owner_bst(ownerStore["root"], name), owners[name]) for name in sorted(owners, key=str.lower)]
+
+def index_candidates(ownerStore, columns, speciesMask):
+    """
+    Return the set of owner names holding at least one species that passes
+    speciesMask. Only held species are looked at.
+    """
+    rowOfId = columns["row_of_id"]
+    candidates = set()
+    for poke_id, owners in ownerStore["index"]["species"].items():
+        if speciesMask[rowOfId[poke_id]]:
+            candidates.update(owners)
+    return candidates
+
+def query_owners(ownerStore, columns, speciesMask):
+    """
+    Indexed version of filter_all_owners: only owners that hold a matching species
+    have their pokedex filtered. Return a list of (owner node, [matching Pokemon dicts]),
+    in name order.
+    """
+    candidates = sorted(index_candidates(ownerStore, columns, speciesMask), key=str.lower)
+    nodes = [find_owner_bst(ownerStore["root"], name) for name in candidates]
+    return [(node, filter_pokedex(columns, node.pokedex, speciesMask)) for node in nodes]
+
+def query_count(ownerStore, columns, speciesMask):
+    """
+    Indexed version of count_all_owners, answered from the index alone.
+    Return (# pokedex entries that pass speciesMask, # owners holding at least one).
+    """
+    rowOfId = columns["row_of_id"]
+    numOfEntries = 0
+    owners = set()
+    for poke_id, holders in ownerStore["index"]["species"].items():
+        if speciesMask[rowOfId[poke_id]]:
+            numOfEntries += len(holders)
+            owners.update(holders)
+    return numOfEntries, len(owners)
+
+
+########################
+# 13) Profiling
+########################
+
+# Profiling state while enabled (see enable_profiling), None otherwise
+_profile = None
+
+def search_depth(root, ownerName):
+    """
+    Return the number of nodes a search for ownerName visits.
+    """
+    ownerName = ownerName.lower()
+    depth = 0
+    node = root
+    while node is not None:
+        depth += 1
+        currentName = node.owner.lower()
+        if ownerName == currentName:
+            break
+        node = node.left if ownerName < currentName else node.right
+    return depth
+
+# Module function -> (op name, counter name, counter(args, result)) for every
+# operation the menus dispatch. Counters record tree depth or scan length.
+PROFILED_FUNCTIONS = {
+    "create_owner_node": ("create", None, None),
+    "find_owner_bst": ("find", "depth", lambda args, result: search_depth(args[0], args[1])),
+    "insert_owner_bst": ("insert", "tree_height", lambda args, result: node_height(args[0]["root"])),
+    "delete_owner_bst": ("delete", "tree_height", lambda args, result: node_height(args[0]["root"])),
+    "add_pokemon_to_owner": ("add", "pokedex_size", lambda args, result: pokedex_size(args[1].pokedex)),
+    "release_pokemon": ("release", "pokedex_size", lambda args, result: pokedex_size(args[1].pokedex)),
+    "evolve_pokemon": ("evolve", "pokedex_size", lambda args, result: pokedex_size(args[1].pokedex)),
+    "sort_owners_by_num_pokemon": ("sort", "owners", lambda args, result: args[0]["size"]),
+    "bfs_traversal": ("print", "tree_height", lambda args, result: node_height(args[0])),
+    "pre_order_print": ("print", "tree_height", lambda args, result: node_height(args[0])),
+    "in_order_print": ("print", "tree_height", lambda args, result: node_height(args[0])),
+    "post_order_print": ("print", "tree_height", lambda args, result: node_height(args[0])),
+    "filter_pokedex": ("filter", "scanned", lambda args, result: pokedex_size(args[1]))
+}
+# Batch op -> (counter name, counter(args, result)) for the ops apply_batch_command
+# carries out itself rather than through one of the functions above
+PROFILED_BATCH_OPS = {
+    "sort": ("owners", lambda args, result: args[0]["size"]),
+    "print": ("tree_height", lambda args, result: node_height(args[0]["root"]))
+}
+
+def profiled(function, stats, counterName, counter):
+    """
+    Wrap function so every call is timed into stats (and its counter recorded).
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter_ns()
+        result = function(*args, **kwargs)
+        elapsed = time.perf_counter_ns() - start
+        stats["count"] += 1
+        stats["total_ns"] += elapsed
+        stats["max_ns"] = max(stats["max_ns"], elapsed)
+        # Bucket b holds calls that took [2^(b-1), 2^b) ns
+        bucket = elapsed.bit_length()
+        stats["histogram"][bucket] = stats["histogram"].get(bucket, 0) + 1
+        if counter is not None:
+            value = counter(args, result)
+            counterStats = stats["counters"].setdefault(counterName, {"sum": 0, "max": 0})
+            counterStats["sum"] += value
+            counterStats["max"] = max(counterStats["max"], value)
+        return result
+    return wrapper
+
+def profiled_batch(function, statsOf):
+    """
+    Wrap apply_batch_command so each op in PROFILED_BATCH_OPS is timed into statsOf(op).
+    """
+    wrappers = {op: profiled(function, statsOf(op), counterName, counter)
+                for op, (counterName, counter) in PROFILED_BATCH_OPS.items()}
+    @functools.wraps(function)
+    def wrapper(ownerStore, command, out):
+        return wrappers.get(command.get("op"), function)(ownerStore, command, out)
+    return wrapper
+
+def enable_profiling():
+    """
+    Replace every function in PROFILED_FUNCTIONS (and the PROFILED_BATCH_OPS of
+    apply_batch_command) with a timing wrapper. Until this is called nothing is
+    wrapped, so profiling costs nothing when it is off.
+    """
+    global _profile
+    if _profile is not None:
+        return
+    _profile = {"ops": {}, "originals": {}}
+    module = globals()
+    def statsOf(op):
+        return _profile["ops"].setdefault(op, {"count": 0, "total_ns": 0, "max_ns": 0,
+                                               "histogram": {}, "counters": {}})
+    for name, (op, counterName, counter) in PROFILED_FUNCTIONS.items():
+        _profile["originals"][name] = module[name]
+        module[name] = profiled(module[name], statsOf(op), counterName, counter)
+    _profile["originals"]["apply_batch_command"] = apply_batch_command
+    module["apply_batch_command"] = profiled_batch(apply_batch_command, statsOf)
+
+def disable_profiling():
+    """
+    Put the original functions back. Return the final profile_report(), or None if profiling was off.
+    """
+    global _profile
+    if _profile is None:
+        return None
+    report = profile_report()
+    globals().update(_profile["originals"])
+    _profile = None
+    return report
+
+def histogram_percentile(stats, p):
+    """
+    Estimate a percentile (in us) from an op's log2 histogram: the upper bound
+    of its bucket, capped at the slowest call seen.
+    """
+    seen = 0
+    for bucket in sorted(stats["histogram"]):
+        seen += stats["histogram"][bucket]
+        if seen >= p / 100 * stats["count"]:
+            return min(1 << bucket, stats["max_ns"]) / 1e3
+    return None
+
+def profile_report():
+    """
+    Return the profile so far as a JSON-ready dict: per op, call count, total and mean
+    time, estimated p50/p90/p99, the latency histogram ("<= N us": calls) and counters.
+    """
+    if _profile is None:
+        return None
+    report = {}
+    for op, stats in _profile["ops"].items():
+        count = stats["count"]
+        if count == 0:
+            continue
+        report[op] = {
+            "count": count,
+            "total_ms": stats["total_ns"] / 1e6,
+            "mean_us": stats["total_ns"] / count / 1e3,
+            "p50_us": histogram_percentile(stats, 50),
+            "p90_us": histogram_percentile(stats, 90),
+            "p99_us": histogram_percentile(stats, 99),
+            "max_us": stats["max_ns"] / 1e3,
+            "histogram": {f"<= {(1 << bucket) / 1e3:g} us": stats["histogram"][bucket]
+                          for bucket in sorted(stats["histogram"])},
+            "counters": {name: {"mean": c["sum"] / count, "max": c["max"]}
+                         for name, c in stats["counters"].items()}
+        }
+    return report
+
+def dump_profile(path=None):
+    """
+    Write profile_report() as JSON to path, or to stderr when path is None or "-".
+    """
+    text = json.dumps(profile_report(), indent=1)
+    if path is None or path == "-":
+        print(text, file=sys.stderr)
+        return
+    with open(path, mode='w', encoding='utf-8') as f:
+        f.write(text + "\n")
+
+
+########################
+# 14) Bulk Import
+########################
+
+def resolve_pokemon(value):
+    """
+    Return the Pokemon dict for an ID (int or digit string) or a name (case-insensitive), or None.
+    """
+    if isinstance(value, int):
+        return get_poke_dict_by_id(value)
+    value = str(value).strip()
+    if value.isdigit():
+        return get_poke_dict_by_id(int(value))
+    return get_poke_dict_by_name(value)
+
+def iter_csv_owner_records(f):
+    """
+    Stream a CSV with an "owner,pokemon" header, one row per Pokemon (a blank
+    pokemon cell gives an owner with an empty pokedex).
+    Yield (line number, owner name or None if the cell is missing, [ID or name]).
+    """
+    reader = csv.DictReader(f)
+    for row in reader:
+        ownerName = row.get("owner")
+        pokemon = (row.get("pokemon") or "").strip()
+        yield reader.line_num, ownerName.strip() if ownerName is not None else None, [pokemon] if pokemon else []
+
+def iter_jsonl_owner_records(f):
+    """
+    Stream JSON lines like {"owner": "Ash", "pokedex": [25, "Mudkip"]}.
+    Yield (line number, owner, pokedex) as found; read_owner_records checks them.
+    Raise ValueError naming a line that is not a JSON object.
+    """
+    for lineNumber, line in enumerate(f, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"{getattr(f, 'name', '?')}:{lineNumber}: invalid JSON ({e})") from None
+        if not isinstance(record, dict):
+            raise ValueError(f"{getattr(f, 'name', '?')}:{lineNumber}: expected a JSON object")
+        yield lineNumber, record.get("owner"), record.get("pokedex", [])
+
+def read_owner_records(path):
+    """
+    Stream (owner name, [Pokemon dicts]) records from a .csv or .jsonl file,
+    one line at a time. Raise ValueError naming the first bad line.
+    """
+    if path.endswith(".csv"):
+        iterRecords = iter_csv_owner_records
+    elif path.endswith((".jsonl", ".json")):
+        iterRecords = iter_jsonl_owner_records
+    else:
+        raise ValueError(f"{path}: expected a .csv or .jsonl file")
+    with open(path, mode='r', encoding='utf-8', newline='') as f:
+        for lineNumber, ownerName, values in iterRecords(f):
+            if not isinstance(ownerName, (str, type(None))):
+                raise ValueError(f"{path}:{lineNumber}: owner name must be a string")
+            if not ownerName:
+                raise ValueError(f"{path}:{lineNumber}: missing owner name")
+            if not isinstance(values, list):
+                raise ValueError(f"{path}:{lineNumber}: pokedex must be a list")
+            pokemons = []
+            for value in values:
+                pokemon = resolve_pokemon(value)
+                if pokemon is None:
+                    raise ValueError(f"{path}:{lineNumber}: unknown Pokemon {value!r}")
+                pokemons.append(pokemon)
+            yield ownerName, pokemons
+
+def import_owner_records(ownerStore, records):
+    """
+    Merge (owner name, [Pokemon dicts]) records into the store: new owners are
+    bulk-loaded (see bulk_load_owners), and owners already in the store get the
+    new Pokemon added. Nothing is changed until every record has been read, so a
+    bad record (ValueError) leaves the store as it was.
+    Return (# new owners, # Pokemon added to existing owners).
+    """
+    newNodes = {}
+    additions = []
+    for ownerName, pokemons in records:
+        key = ownerName.lower()
+        ownerNode = newNodes.get(key)
+        if ownerNode is None:
+            existing = find_owner_bst(ownerStore["root"], ownerName)
+            if existing is not None:
+                additions.extend((existing, pokemon) for pokemon in pokemons)
+                continue
+            ownerNode = newNodes[key] = create_owner_node(ownerName, None)
+        for pokemon in pokemons:
+            pokedex_add(ownerNode.pokedex, pokemon)
+    numOfAdded = sum(add_pokemon_to_owner(ownerStore, ownerNode, pokemon) for ownerNode, pokemon in additions)
+    bulk_load_owners(ownerStore, list(newNodes.values()))
+    return len(newNodes), numOfAdded
+
+def import_owners(ownerStore, path):
+    """
+    Stream owners and their pokedexes from a .csv or .jsonl file into the store
+    (see read_owner_records and import_owner_records).
+    Nothing is changed if the file has a bad line (ValueError names it).
+    Return (# new owners, # Pokemon added to existing owners).
+    """
+    return import_owner_records(ownerStore, read_owner_records(path))
+
+
+def add_species_arguments(parser):
+    """
+    Add the species catalog options (shared by every entry point) to an argparse parser.
+    """
+    parser.add_argument("--species", action="append", default=[], metavar="FILE",
+                        help="load species from FILE instead of the Hoenn CSV (repeatable; "
+                             "several files are merged by national ID)")
+    parser.add_argument("--national", action="store_true",
+                        help="key species by their National ID even for a single file")
+
+def apply_species_arguments(args):
+    """
+    Switch the catalog to the species files chosen by add_species_arguments' options, if any.
+    """
+    if args.species or args.national:
+        use_species_files(args.species or [HOENN_CSV], True if args.national else None)
+
+
 def main():
     """
-    Entry point: calls main_menu().
+    Entry point: calls main_menu(), or run_batch() with --batch [FILE].
+    With --import, owners are bulk-loaded from files first; with --species,
+    the catalog is loaded from other species files.
+    With --data-dir, owners are recovered from and saved to that directory;
+    with --profile, operation timings are dumped on exit.
     """
-    main_menu()
-    pass
+    parser = argparse.ArgumentParser(description="Pokedex owners manager.")
+    parser.add_argument("--batch", nargs="?", const="-", metavar="FILE",
+                        help="apply JSON-lines commands from FILE (or stdin) instead of the menus")
+    parser.add_argument("--data-dir", metavar="DIR",
+                        help="keep owners in DIR (snapshot + journal) across runs")
+    parser.add_argument("--import", dest="import_files", action="append", default=[], metavar="FILE",
+                        help="bulk-load owners from a .csv or .jsonl file first (repeatable)")
+    parser.add_argument("--profile", nargs="?", const="-", metavar="FILE",
+                        help="time every operation and dump the profile as JSON to FILE (or stderr) on exit")
+    add_species_arguments(parser)
+    args = parser.parse_args()
+    apply_species_arguments(args)
+    if args.profile:
+        enable_profiling()
+    if args.data_dir:
+        ownerStore = open_owner_store(args.data_dir)
+    else:
+        ownerStore = create_owner_store()
+    try:
+        for path in args.import_files:
+            try:
+                numOfOwners, numOfAdded = import_owners(ownerStore, path)
+            except (OSError, ValueError) as e:
+                sys.exit(f"Could not import owners: {e}")
+            print(f"Imported {numOfOwners} new owners from {path}; added {numOfAdded} Pokemon to existing owners.")
+        if args.batch is None:
+            main_menu(ownerStore)
+        elif args.batch == "-":
+            run_batch(sys.stdin, sys.stdout, ownerStore)
+        else:
+            with open(args.batch, mode='r', encoding='utf-8') as f:
+                run_batch(f, sys.stdout, ownerStore)
+    finally:
+        if args.data_dir:
+            close_owner_store(ownerStore)
+        if args.profile:
+            dump_profile(args.profile)
 
 if __name__ == "__main__":
     main()
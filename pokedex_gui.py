@@ -1,93 +1,326 @@
-# pokedex_gui.py
-
-import tkinter as tk
-from PIL import Image, ImageTk
-import os
-
-
-def show_Pokedex_GUI(pokeList):
-    """
-    Display each Pokemon in a simple Tkinter window with its Name, Type, HP,
-    Attack, and optionally an image from the 'pokemons' folder.
-    We allow horizontal resizing so each Pokemon 'frame' expands in width.
-    """
-    root = tk.Tk()
-    root.title("My Pokedex GUI")
-
-    # Create a canvas and a vertical scrollbar
-    canvas = tk.Canvas(root)
-    scrollbar = tk.Scrollbar(root, orient="vertical", command=canvas.yview)
-    canvas.configure(yscrollcommand=scrollbar.set)
-
-    # This 'scrollable_frame' is where we'll place each Pokemon frame.
-    scrollable_frame = tk.Frame(canvas)
-
-    # A callback to update the scrollregion whenever 'scrollable_frame' changes size
-    def on_frame_configure(event):
-        canvas.configure(scrollregion=canvas.bbox("all"))
-
-    scrollable_frame.bind("<Configure>", on_frame_configure)
-
-    # Actually place 'scrollable_frame' in the canvas
-    # We'll store the canvas window ID so we can update its width on resize
-    canvas_window = canvas.create_window(
-        (0, 0), window=scrollable_frame, anchor="nw")
-
-    # A callback to keep the scrollable_frame the same width as the canvas
-    def on_canvas_configure(event):
-        # Set the scrollable_frame width to match canvas' width
-        canvas.itemconfig(canvas_window, width=event.width)
-
-    canvas.bind("<Configure>", on_canvas_configure)
-
-    # Mouse wheel handling
-    def on_mouse_wheel(event):
-        # On Windows/macOS: event.delta is typically ±120 per wheel step
-        canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-
-    canvas.bind_all("<MouseWheel>", on_mouse_wheel)  # Windows/macOS
-    # For Linux (buttons 4=up, 5=down):
-    canvas.bind_all("<Button-4>", lambda e: canvas.yview_scroll(-1, "units"))
-    canvas.bind_all("<Button-5>", lambda e: canvas.yview_scroll(1, "units"))
-
-    # Pack the canvas and scrollbar
-    canvas.pack(side="left", fill="both", expand=True)
-    scrollbar.pack(side="right", fill="y")
-
-    if not pokeList:
-        msg = tk.Label(scrollable_frame, text="No Pokemon in this Pokedex!")
-        msg.pack(padx=10, pady=10)
-    else:
-        for poke in pokeList:
-            # Create a frame for each Pokémon, fill horizontally, expand so it can grow
-            frame = tk.Frame(scrollable_frame, bd=2,
-                             relief='groove', padx=5, pady=5)
-            frame.pack(side="top", fill="x", expand=True, padx=10, pady=5)
-
-            # Pokemon text info
-            info = (
-                f"ID: {poke['ID']} | "
-                f"Name: {poke['Name']} | "
-                f"Type: {poke['Type']} | "
-                f"HP: {poke['HP']} | "
-                f"Attack: {poke['Attack']} | "
-                f"Can Evolve: {poke['Can Evolve']}"
-            )
-            # The text label also fills horizontally and expands
-            label = tk.Label(frame, text=info, anchor="w")
-            label.pack(side="left", fill="x", expand=True)
-
-            image_path = os.path.join("pokemons", f"{poke['ID'] + 251}.png")
-            if os.path.exists(image_path):
-                try:
-                    img = Image.open(image_path)
-                    img = img.resize((80, 80), Image.ANTIALIAS)
-                    photo = ImageTk.PhotoImage(img)
-                    picLabel = tk.Label(frame, image=photo)
-                    picLabel.photo = photo  # keep reference
-                    picLabel.pack(side="right", padx=5)
-                except Exception as e:
-                    print(f"Error loading image {image_path}: {e}")
-                    # If error, we'll ignore and just not show the image
-
-    root.mainloop()
+# pokedex_gui.py
+
+import tkinter as tk
+from PIL import Image, ImageTk
+import itertools
+import json
+import os
+import queue
+import threading
+
+# Sprites live next to this module, whatever the working directory is.
+SPRITES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pokemons")
+THUMB_SIZE = (80, 80)
+# Every resized sprite is stored as raw RGBA in one fixed-size slot of the atlas
+# file; the JSON index maps sprite file name -> [slot, source mtime_ns, source size].
+ATLAS_PATH = os.path.join(SPRITES_DIR, "thumbnails.atlas")
+ATLAS_INDEX_PATH = ATLAS_PATH + ".json"
+SLOT_BYTES = THUMB_SIZE[0] * THUMB_SIZE[1] * 4
+# Pixel height of one Pokemon row (sprite plus padding) in the virtualized list
+ROW_HEIGHT = 110
+# Sprite decoding threads, and how often (ms) the Tk loop collects their results
+DECODE_WORKERS = min(4, os.cpu_count() or 1)
+DECODE_POLL_MS = 30
+
+_atlas = None
+# Guards the atlas file and index, which the decoding threads share
+_atlas_lock = threading.Lock()
+
+
+def open_atlas():
+    """
+    Open (creating if needed) the thumbnail atlas and its index, once per process.
+    An index written for another thumbnail size is discarded.
+    """
+    global _atlas
+    if _atlas is None:
+        index = {"size": list(THUMB_SIZE), "slots": {}}
+        try:
+            with open(ATLAS_INDEX_PATH, mode='r', encoding='utf-8') as f:
+                stored = json.load(f)
+            if stored.get("size") == list(THUMB_SIZE):
+                index = stored
+        except (OSError, ValueError):
+            pass
+        mode = 'r+b' if os.path.exists(ATLAS_PATH) and index["slots"] else 'w+b'
+        _atlas = {"file": open(ATLAS_PATH, mode), "index": index, "dirty": False}
+    return _atlas
+
+
+def flush_atlas():
+    """
+    Write the atlas index back to disk if new thumbnails were added.
+    """
+    with _atlas_lock:
+        if _atlas is not None and _atlas["dirty"]:
+            _atlas["file"].flush()
+            with open(ATLAS_INDEX_PATH, mode='w', encoding='utf-8') as f:
+                json.dump(_atlas["index"], f)
+            _atlas["dirty"] = False
+
+
+def close_atlas():
+    """
+    Flush the atlas index and close the atlas file (it is reopened on next use).
+    """
+    global _atlas
+    flush_atlas()
+    with _atlas_lock:
+        if _atlas is not None:
+            _atlas["file"].close()
+            _atlas = None
+
+
+def start_decoders(requests, results, stop, done):
+    """
+    Start DECODE_WORKERS daemon threads. Each takes (priority, seq, image_path)
+    requests from the requests PriorityQueue, smallest first, and puts
+    (image_path, thumbnail or None) on the results queue until stop is set.
+    Paths already in the done set (re-queued by an older scroll position) are skipped.
+    Return the threads.
+    """
+    def work():
+        while not stop.is_set():
+            try:
+                _, _, image_path = requests.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if image_path in done:
+                continue
+            try:
+                thumb = get_thumbnail(image_path)
+            except Exception as e:
+                print(f"Error loading image {image_path}: {e}")
+                thumb = None
+            results.put((image_path, thumb))
+
+    threads = [threading.Thread(target=work, daemon=True) for _ in range(DECODE_WORKERS)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def get_thumbnail(image_path):
+    """
+    Return the 80x80 RGBA thumbnail of a sprite as a PIL image, or None if the file is missing.
+    Thumbnails are read straight from the atlas; a sprite is only decoded and resized
+    when it is new or its PNG changed (different mtime or size) since it was cached.
+    """
+    try:
+        stat = os.stat(image_path)
+    except OSError:
+        return None
+    key = os.path.basename(image_path)
+    with _atlas_lock:
+        atlas = open_atlas()
+        entry = atlas["index"]["slots"].get(key)
+        if entry is not None and entry[1:] == [stat.st_mtime_ns, stat.st_size]:
+            atlas["file"].seek(entry[0] * SLOT_BYTES)
+            return Image.frombytes("RGBA", THUMB_SIZE, atlas["file"].read(SLOT_BYTES))
+    # Decode outside the lock so several threads can work at once
+    with Image.open(image_path) as img:
+        thumb = img.convert("RGBA").resize(THUMB_SIZE, Image.LANCZOS)
+    with _atlas_lock:
+        slots = atlas["index"]["slots"]
+        entry = slots.get(key)
+        slot = entry[0] if entry is not None else len(slots)
+        atlas["file"].seek(slot * SLOT_BYTES)
+        atlas["file"].write(thumb.tobytes())
+        slots[key] = [slot, stat.st_mtime_ns, stat.st_size]
+        atlas["dirty"] = True
+    return thumb
+
+
+def pokemon_info(poke):
+    """
+    Return the text shown for one Pokemon row.
+    """
+    return (
+        f"ID: {poke['ID']} | "
+        f"Name: {poke['Name']} | "
+        f"Type: {poke['Type']} | "
+        f"HP: {poke['HP']} | "
+        f"Attack: {poke['Attack']} | "
+        f"Can Evolve: {poke['Can Evolve']}"
+    )
+
+
+def show_Pokedex_GUI(pokeList):
+    """
+    Display each Pokemon in a simple Tkinter window with its Name, Type, HP,
+    Attack, and optionally an image from the 'pokemons' folder.
+    We allow horizontal resizing so each Pokemon 'frame' expands in width.
+    Only the rows that fit in the window exist as widgets: a small pool of row
+    frames is moved and refilled while scrolling, so memory and startup time
+    stay flat however long the list is.
+    """
+    root = tk.Tk()
+    root.title("My Pokedex GUI")
+
+    # Create a canvas and a vertical scrollbar
+    canvas = tk.Canvas(root)
+    scrollbar = tk.Scrollbar(root, orient="vertical")
+    canvas.configure(yscrollcommand=scrollbar.set)
+
+    # Pack the canvas and scrollbar
+    canvas.pack(side="left", fill="both", expand=True)
+    scrollbar.pack(side="right", fill="y")
+
+    if not pokeList:
+        msg = tk.Label(canvas, text="No Pokemon in this Pokedex!")
+        canvas.create_window((10, 10), window=msg, anchor="nw")
+        root.mainloop()
+        return
+
+    # Every row gets the same height, so the full list is just a tall scrollregion
+    canvas.configure(scrollregion=(0, 0, 0, len(pokeList) * ROW_HEIGHT))
+
+    # PhotoImages belong to this Tk root, so they are cached per window
+    # (None = sprite missing or unreadable)
+    photo_cache = {}
+    # Pooled rows: {"item": canvas window id, "frame", "label", "pic", "index"}
+    pool = []
+    # Shown until a row's sprite has been decoded
+    placeholder = tk.PhotoImage(width=THUMB_SIZE[0], height=THUMB_SIZE[1])
+
+    # Sprites are decoded on worker threads. Each refresh queues the rows in view
+    # first (then a screen of rows either side), ahead of anything queued earlier.
+    requests = queue.PriorityQueue()
+    results = queue.Queue()
+    stop = threading.Event()
+    done = set()
+    # image path -> refresh generation it was last queued in
+    requested = {}
+    order = itertools.count()
+    decoders = start_decoders(requests, results, stop, done)
+
+    def image_path_of(index):
+        # Sprites are named by national dex number
+        poke = pokeList[index]
+        return os.path.join(SPRITES_DIR, f"{poke.get('National ID', poke['ID'])}.png")
+
+    def request_photos(first, last, generation):
+        span = last - first
+        around = list(range(first, last))
+        around += list(range(last, min(last + span, len(pokeList))))
+        around += list(range(first - 1, max(first - span, 0) - 1, -1))
+        for distance, index in enumerate(around):
+            image_path = image_path_of(index)
+            if image_path in photo_cache or requested.get(image_path) == generation:
+                continue
+            requested[image_path] = generation
+            requests.put(((-generation, distance), next(order), image_path))
+
+    # Runs on the Tk thread: turn decoded thumbnails into PhotoImages
+    def poll_results():
+        if stop.is_set():
+            return
+        changed = False
+        while True:
+            try:
+                image_path, thumb = results.get_nowait()
+            except queue.Empty:
+                break
+            if image_path not in photo_cache:
+                photo_cache[image_path] = ImageTk.PhotoImage(thumb) if thumb is not None else None
+                done.add(image_path)
+                changed = True
+        if changed:
+            for row in pool:
+                if row["index"] is not None:
+                    show_photo(row)
+            flush_atlas()
+        root.after(DECODE_POLL_MS, poll_results)
+
+    def show_photo(row):
+        image_path = image_path_of(row["index"])
+        photo = photo_cache.get(image_path, placeholder)
+        row["pic"].configure(image=photo if photo is not None else "")
+        row["pic"].photo = photo  # keep reference
+
+    def on_close():
+        stop.set()
+        # Record thumbnails decoded since the last poll, so they are not decoded again
+        flush_atlas()
+        root.destroy()
+
+    root.protocol("WM_DELETE_WINDOW", on_close)
+    generations = itertools.count(1)
+
+    def make_row():
+        frame = tk.Frame(canvas, bd=2, relief='groove', padx=5, pady=5)
+        # The text label fills horizontally and expands
+        label = tk.Label(frame, anchor="w")
+        label.pack(side="left", fill="x", expand=True)
+        pic = tk.Label(frame)
+        pic.pack(side="right", padx=5)
+        item = canvas.create_window((10, 0), window=frame, anchor="nw",
+                                    width=max(canvas.winfo_width() - 20, 1),
+                                    height=ROW_HEIGHT - 10)
+        return {"item": item, "frame": frame, "label": label, "pic": pic, "index": None}
+
+    def fill_row(row, index):
+        poke = pokeList[index]
+        row["index"] = index
+        row["label"].configure(text=pokemon_info(poke))
+        show_photo(row)
+        canvas.coords(row["item"], 10, index * ROW_HEIGHT + 5)
+        canvas.itemconfigure(row["item"], state="normal")
+
+    # Show the rows in view, reusing rows that scrolled out of it
+    def refresh(event=None):
+        first = max(int(canvas.canvasy(0) // ROW_HEIGHT), 0)
+        last = min(first + canvas.winfo_height() // ROW_HEIGHT + 2, len(pokeList))
+        while len(pool) < last - first:
+            pool.append(make_row())
+        wanted = set(range(first, last))
+        free = []
+        for row in pool:
+            if row["index"] in wanted:
+                wanted.discard(row["index"])
+            else:
+                free.append(row)
+        wanted = sorted(wanted)
+        for index, row in zip(wanted, free):
+            fill_row(row, index)
+        for row in free[len(wanted):]:
+            row["index"] = None
+            canvas.itemconfigure(row["item"], state="hidden")
+        request_photos(first, last, next(generations))
+
+    def on_scrollbar(*args):
+        canvas.yview(*args)
+        refresh()
+
+    scrollbar.configure(command=on_scrollbar)
+
+    # Keep the rows the same width as the canvas
+    def on_canvas_configure(event):
+        for row in pool:
+            canvas.itemconfig(row["item"], width=max(event.width - 20, 1))
+        refresh()
+
+    canvas.bind("<Configure>", on_canvas_configure)
+
+    # Mouse wheel handling
+    def on_mouse_wheel(event):
+        # On Windows/macOS: event.delta is typically ±120 per wheel step
+        canvas.yview_scroll(int(-1*(event.delta/120)), "units")
+        refresh()
+
+    def on_wheel_step(step):
+        canvas.yview_scroll(step, "units")
+        refresh()
+
+    canvas.bind_all("<MouseWheel>", on_mouse_wheel)  # Windows/macOS
+    # For Linux (buttons 4=up, 5=down):
+    canvas.bind_all("<Button-4>", lambda e: on_wheel_step(-1))
+    canvas.bind_all("<Button-5>", lambda e: on_wheel_step(1))
+
+    root.after(DECODE_POLL_MS, poll_results)
+    root.mainloop()
+    stop.set()
+    # Let any decode in progress land in the atlas before it is closed
+    for thread in decoders:
+        thread.join()
+    close_atlas()
@@ -0,0 +1,303 @@
+# pokedex_server.py
+
+import argparse
+import asyncio
+import concurrent.futures
+import contextlib
+import json
+import os
+import random
+import threading
+import time
+
+import ex7
+
+# Ops that only read the owner store; everything else is a write
+READ_OPS = {"sort", "print", "filter", "count", "owners", "stats", "suggest"}
+# Whole-store reports, rendered from a snapshot outside the lock
+SNAPSHOT_OPS = {"sort", "print"}
+# Threads serving read requests (writes always run on one dedicated thread)
+READ_WORKERS = min(8, (os.cpu_count() or 1) + 2)
+
+
+########################
+# 1) Read/Write Lock
+########################
+
+def create_rw_lock():
+    """
+    Create and return a readers-writer lock dict: any number of readers, or one writer.
+    Waiting writers block new readers, so a steady read load cannot starve writes.
+    """
+    return {"cond": threading.Condition(), "readers": 0, "writer": False, "waitingWriters": 0}
+
+@contextlib.contextmanager
+def read_locked(lock):
+    """
+    Hold the lock shared for the duration of a with block.
+    """
+    with lock["cond"]:
+        while lock["writer"] or lock["waitingWriters"]:
+            lock["cond"].wait()
+        lock["readers"] += 1
+    try:
+        yield
+    finally:
+        with lock["cond"]:
+            lock["readers"] -= 1
+            if lock["readers"] == 0:
+                lock["cond"].notify_all()
+
+@contextlib.contextmanager
+def write_locked(lock):
+    """
+    Hold the lock exclusively for the duration of a with block.
+    """
+    with lock["cond"]:
+        lock["waitingWriters"] += 1
+        while lock["writer"] or lock["readers"]:
+            lock["cond"].wait()
+        lock["waitingWriters"] -= 1
+        lock["writer"] = True
+    try:
+        yield
+    finally:
+        with lock["cond"]:
+            lock["writer"] = False
+            lock["cond"].notify_all()
+
+
+########################
+# 2) Shared Owner Store
+########################
+
+def create_shared_store(ownerStore, importDir=None):
+    """
+    Wrap an owner store for concurrent use. Reads run on a thread pool under the
+    shared lock; writes are sequenced through a single writer thread under the
+    exclusive lock, so they apply (and are journaled) in arrival order.
+    Clients may only import files from importDir (and not at all without one).
+    """
+    # Build the lazy catalog caches up front rather than racing on them
+    ex7.get_hoenn_columns()
+    return {
+        "store": ownerStore,
+        "importDir": os.path.realpath(importDir) if importDir else None,
+        "lock": create_rw_lock(),
+        "snapshotLock": threading.Lock(),
+        "readers": concurrent.futures.ThreadPoolExecutor(READ_WORKERS, thread_name_prefix="read"),
+        "writer": concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix="write")
+    }
+
+def take_snapshot(shared):
+    """
+    Return a read-only store view for long reports: a copy-on-write snapshot of the
+    owner tree plus a copy of the leaderboard. Writes only wait while it is taken,
+    not while the report is rendered from it.
+    """
+    with read_locked(shared["lock"]), shared["snapshotLock"]:
+        view = dict(ex7.snapshot_owner_tree(shared["store"]))
+        view["leaderboard"] = list(shared["store"]["leaderboard"])
+    return view
+
+def import_path(shared, path):
+    """
+    Resolve a client's import path inside the configured import directory.
+    Raise ValueError if imports are disabled or the path leads outside it.
+    """
+    if shared["importDir"] is None:
+        raise ValueError("imports are disabled on this server")
+    resolved = os.path.realpath(os.path.join(shared["importDir"], path))
+    if os.path.commonpath([resolved, shared["importDir"]]) != shared["importDir"]:
+        raise ValueError("import path is outside the import directory")
+    return resolved
+
+def run_command(shared, command):
+    """
+    Apply one command (same format as ex7 batch mode) and return its result lines.
+    Runs on an executor thread.
+    """
+    if command["op"] == "import":
+        command = dict(command, path=import_path(shared, command["path"]))
+    out = []
+    if command["op"] in SNAPSHOT_OPS:
+        ex7.apply_batch_command(take_snapshot(shared), command, out)
+    elif command["op"] in READ_OPS:
+        with read_locked(shared["lock"]):
+            ex7.apply_batch_command(shared["store"], command, out)
+    else:
+        with write_locked(shared["lock"]):
+            ex7.apply_batch_command(shared["store"], command, out)
+    return out
+
+async def execute(shared, command):
+    """
+    Schedule a command on the read pool or the single writer and wait for its lines.
+    """
+    executor = shared["readers"] if command["op"] in READ_OPS else shared["writer"]
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, run_command, shared, command)
+
+
+########################
+# 3) Server
+########################
+
+def handle_client(shared):
+    """
+    Return a connection handler. Each request is one JSON command per line; each
+    response is one JSON line: {"lines": [...]} or {"error": "..."}.
+    """
+    async def handler(reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    command = ex7.parse_batch_command(line.decode("utf-8"))
+                    if command is None:
+                        continue
+                    response = {"lines": await execute(shared, command)}
+                except KeyError as e:
+                    response = {"error": f"invalid command (missing {e})"}
+                except (ValueError, TypeError) as e:
+                    response = {"error": f"invalid command ({e})"}
+                except ConnectionError:
+                    raise
+                except Exception as e:
+                    # Whatever went wrong, answer it and keep serving this connection
+                    response = {"error": f"command failed ({type(e).__name__})"}
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+    return handler
+
+async def serve(shared, host, port, unixPath=None):
+    """
+    Serve the shared store on a TCP port, or on a Unix socket if unixPath is given.
+    """
+    if unixPath:
+        server = await asyncio.start_unix_server(handle_client(shared), path=unixPath)
+        print(f"Serving on {unixPath}")
+    else:
+        server = await asyncio.start_server(handle_client(shared), host, port)
+        print(f"Serving on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+########################
+# 4) Load Generator
+########################
+
+async def open_connection(host, port, unixPath=None):
+    """
+    Open a client connection over TCP, or to the Unix socket if unixPath is given.
+    """
+    if unixPath:
+        return await asyncio.open_unix_connection(unixPath)
+    return await asyncio.open_connection(host, port)
+
+def load_commands(clientId, numOfOps, readRatio, rng):
+    """
+    Yield a client's command mix: it creates its own owners, then adds, releases
+    and evolves, interleaved with reads (owner pages and per-owner filters).
+    """
+    owners = [f"load-{clientId}-{i}" for i in range(max(numOfOps // 50, 1))]
+    for name in owners:
+        yield {"op": "new", "owner": name, "starter": rng.randint(1, 3)}
+    for _ in range(numOfOps - len(owners)):
+        name = rng.choice(owners)
+        if rng.random() < readRatio:
+            if rng.random() < 0.5:
+                yield {"op": "owners", "prefix": f"load-{clientId}-", "limit": 20}
+            else:
+                yield {"op": "filter", "owner": name, "attack_above": rng.randint(40, 120)}
+            continue
+        kind = rng.random()
+        pokemon = rng.choice(ex7.get_hoenn_catalog()["records"])
+        if kind < 0.6:
+            yield {"op": "add", "owner": name, "id": pokemon["ID"]}
+        elif kind < 0.8:
+            yield {"op": "release", "owner": name, "name": pokemon["Name"]}
+        else:
+            yield {"op": "evolve", "owner": name, "name": pokemon["Name"]}
+
+async def load_client(clientId, numOfOps, readRatio, seed, host, port, unixPath, latencies):
+    """
+    Send one client's load_commands one at a time, appending each round trip (s) to latencies.
+    """
+    reader, writer = await open_connection(host, port, unixPath)
+    rng = random.Random(seed + clientId)
+    for command in load_commands(clientId, numOfOps, readRatio, rng):
+        start = time.perf_counter()
+        writer.write(json.dumps(command).encode("utf-8") + b"\n")
+        await writer.drain()
+        await reader.readline()
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+    await writer.wait_closed()
+
+async def run_load(numOfClients, numOfOps, readRatio, seed, host, port, unixPath=None):
+    """
+    Drive the server with numOfClients concurrent connections of numOfOps requests each
+    and print throughput and latency percentiles.
+    """
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(load_client(i, numOfOps, readRatio, seed, host, port, unixPath, latencies)
+                           for i in range(numOfClients)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    def percentile(p):
+        return latencies[min(int(p / 100 * len(latencies)), len(latencies) - 1)] * 1000
+    print(f"{len(latencies)} requests from {numOfClients} clients in {elapsed:.2f}s "
+          f"({len(latencies) / elapsed:.0f} req/s)")
+    print(f"latency ms: p50 {percentile(50):.2f}  p90 {percentile(90):.2f}  "
+          f"p99 {percentile(99):.2f}  max {latencies[-1] * 1000:.2f}")
+
+
+def main():
+    """
+    Entry point: serve the owner store, or with --load drive a running server.
+    """
+    parser = argparse.ArgumentParser(description="Multi-session Pokedex owner server and load generator.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7007)
+    parser.add_argument("--unix", metavar="PATH", help="use a Unix socket instead of TCP")
+    parser.add_argument("--data-dir", metavar="DIR", help="persist owners in DIR (see ex7 --data-dir)")
+    parser.add_argument("--import-dir", metavar="DIR",
+                        help="let clients import owner files from DIR (imports are refused otherwise)")
+    parser.add_argument("--load", action="store_true", help="run the load generator against a running server")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=2000, help="requests per client")
+    parser.add_argument("--read-ratio", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=7)
+    ex7.add_species_arguments(parser)
+    args = parser.parse_args()
+    ex7.apply_species_arguments(args)
+    if args.load:
+        asyncio.run(run_load(args.clients, args.ops, args.read_ratio, args.seed,
+                             args.host, args.port, args.unix))
+        return
+    if args.data_dir:
+        ownerStore = ex7.open_owner_store(args.data_dir)
+    else:
+        ownerStore = ex7.create_owner_store()
+    shared = create_shared_store(ownerStore, args.import_dir)
+    try:
+        asyncio.run(serve(shared, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shared["writer"].shutdown()
+        shared["readers"].shutdown()
+        if args.data_dir:
+            ex7.close_owner_store(ownerStore)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,490 @@
+# pokedex_shards.py
+
+import argparse
+import heapq
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+import zlib
+
+import ex7
+
+# Worker processes by default: one per core
+DEFAULT_SHARDS = os.cpu_count() or 1
+# Ops that touch a single owner, routed to the shard that holds it
+OWNER_OPS = {"new", "add", "release", "evolve", "delete"}
+
+
+########################
+# 1) Shard Worker
+########################
+
+def shard_command(ownerStore, command):
+    """
+    Apply one batch command to this shard and return its result lines.
+    """
+    out = []
+    ex7.apply_batch_command(ownerStore, command, out)
+    return out
+
+def shard_leaderboard(ownerStore):
+    """
+    Return this shard's leaderboard: (size, lowercase name, name), already sorted.
+    """
+    return list(ownerStore["leaderboard"])
+
+def shard_print(ownerStore):
+    """
+    Return this shard's in-order "Print All" output as one (lowercase name, text)
+    block per owner, in name order. Blocks are joined here, in parallel, so only
+    one string per owner has to cross the pipe.
+    """
+    nodes = list(ex7.iter_in_order(ownerStore["root"]))
+    lines = list(ex7.render_owner_lines(nodes))
+    blocks = []
+    start = 0
+    for node in nodes:
+        end = start + 1 + ex7.pokedex_size(node.pokedex)
+        blocks.append((node.owner.lower(), "\n".join(lines[start:end])))
+        start = end
+    return blocks
+
+def shard_filter(ownerStore, command):
+    """
+    Return the cross-owner filter result of this shard as (lowercase name, text)
+    blocks in name order, for owners with at least one match.
+    """
+    results = ex7.query_owners(ownerStore, ex7.get_hoenn_columns(), ex7.batch_species_mask(command))
+    return [(node.owner.lower(), "\n".join([f"Owner: {node.owner}"] + [ex7.format_pokemon(pokemon) for pokemon in matches]))
+            for node, matches in results]
+
+def shard_count(ownerStore, command):
+    """
+    Return (# matching pokedex entries, # owners with a match) for this shard.
+    """
+    return ex7.query_count(ownerStore, ex7.get_hoenn_columns(), ex7.batch_species_mask(command))
+
+def shard_stats(ownerStore):
+    """
+    Return this shard's population_stats() totals.
+    """
+    return ex7.population_stats(ownerStore["root"])
+
+def shard_rank(ownerStore, ownerName):
+    """
+    Return how many of this shard's owners sort before ownerName.
+    """
+    return ex7.owner_name_rank(ownerStore["root"], ownerName)
+
+def shard_evolve_all(ownerStore, fully):
+    """
+    Evolve every owner's Pokemon on this shard and return how many evolved.
+    """
+    return ex7.evolve_all_owners(ownerStore, fully)
+
+def shard_page(ownerStore, limit, after, low, high):
+    """
+    Return up to limit owners of this shard in name order, as (lowercase name, line).
+    """
+    nodes, _ = ex7.owner_page(ownerStore["root"], limit, after, low, high)
+    return [(node.owner.lower(), f"Owner: {node.owner} (has {ex7.pokedex_size(node.pokedex)} Pokemon)")
+            for node in nodes]
+
+def shard_import(ownerStore, records):
+    """
+    Bulk-load this shard's share of an import; return (# new owners, # Pokemon added).
+    """
+    return ex7.import_owner_records(ownerStore, records)
+
+def shard_import_file(ownerStore, path, index, numOfShards):
+    """
+    Import this shard's owners (those that hash to index) from a .csv/.jsonl file,
+    streaming it line by line. Every shard reads and checks every line, so a bad
+    line makes all of them fail before any changes anything.
+    Return (# new owners, # Pokemon added to existing owners).
+    """
+    records = ((ownerName, pokemons) for ownerName, pokemons in ex7.read_owner_records(path)
+               if shard_index(ownerName, numOfShards) == index)
+    return ex7.import_owner_records(ownerStore, records)
+
+def shard_savepoint(ownerStore, name):
+    """
+    Keep a snapshot of this shard's tree under name and return its owner count.
+    """
+    ownerStore.setdefault("savepoints", {})[name] = ex7.snapshot_owner_tree(ownerStore)
+    return ownerStore["size"]
+
+def shard_rollback(ownerStore, name):
+    """
+    Roll this shard back to a savepoint. Return its owner count, or None if there is no such savepoint.
+    """
+    snapshot = ownerStore.get("savepoints", {}).get(name)
+    if snapshot is None:
+        return None
+    ex7.rollback_owner_store(ownerStore, snapshot)
+    return ownerStore["size"]
+
+# Calls a shard worker answers: name -> function(ownerStore, *args)
+SHARD_CALLS = {
+    "command": shard_command,
+    "leaderboard": shard_leaderboard,
+    "print": shard_print,
+    "filter": shard_filter,
+    "count": shard_count,
+    "stats": shard_stats,
+    "rank": shard_rank,
+    "evolve_all": shard_evolve_all,
+    "page": shard_page,
+    "import": shard_import,
+    "import_file": shard_import_file,
+    "savepoint": shard_savepoint,
+    "rollback": shard_rollback,
+    "size": lambda ownerStore: ownerStore["size"]
+}
+
+def send_error(conn, error):
+    """
+    Send an exception back to the caller, as a RuntimeError if it cannot be pickled.
+    """
+    try:
+        conn.send(("error", error))
+    except Exception:
+        conn.send(("error", RuntimeError(f"{type(error).__name__}: {error}")))
+
+def shard_worker(conn, dataDir, species):
+    """
+    Worker process main loop: load the species catalog from species (paths, national),
+    own one owner store (persisted in dataDir, if given) and answer (call name, args)
+    requests on conn with ("ok", result) or ("error", exception), until it receives
+    None. A failing call never stops the worker.
+    """
+    ex7.use_species_files(*species)
+    ownerStore = ex7.open_owner_store(dataDir) if dataDir else ex7.create_owner_store()
+    ex7.get_hoenn_columns()
+    try:
+        while True:
+            request = conn.recv()
+            if request is None:
+                break
+            name, args = request
+            try:
+                result = SHARD_CALLS[name](ownerStore, *args)
+            except Exception as e:
+                send_error(conn, e)
+                continue
+            conn.send(("ok", result))
+    finally:
+        if dataDir:
+            ex7.close_owner_store(ownerStore)
+        conn.close()
+
+
+########################
+# 2) Sharded Store
+########################
+
+def create_sharded_store(numOfShards=DEFAULT_SHARDS, dataDir=None):
+    """
+    Start numOfShards worker processes, each holding the owners whose name hashes
+    to it. With dataDir, shard i persists in dataDir/shard-i; the shard count is
+    recorded there, since owners cannot move between shards.
+    Return the sharded store dict: 'conns' and 'processes', one per shard.
+    """
+    if dataDir:
+        os.makedirs(dataDir, exist_ok=True)
+        countPath = os.path.join(dataDir, "shards")
+        if os.path.exists(countPath):
+            with open(countPath, mode='r', encoding='utf-8') as f:
+                recorded = int(f.read())
+            if recorded != numOfShards:
+                raise ValueError(f"{dataDir} holds {recorded} shards, not {numOfShards}")
+        else:
+            with open(countPath, mode='w', encoding='utf-8') as f:
+                f.write(f"{numOfShards}\n")
+    sharded = {"conns": [], "processes": []}
+    # Workers load the same species files as this process, however they are started
+    species = ex7.get_species_files()
+    for i in range(numOfShards):
+        parentConn, childConn = multiprocessing.Pipe()
+        shardDir = os.path.join(dataDir, f"shard-{i}") if dataDir else None
+        process = multiprocessing.Process(target=shard_worker, args=(childConn, shardDir, species), daemon=True)
+        process.start()
+        childConn.close()
+        sharded["conns"].append(parentConn)
+        sharded["processes"].append(process)
+    return sharded
+
+def close_sharded_store(sharded):
+    """
+    Stop every worker (each one closes its own journal) and wait for them to exit.
+    """
+    for conn in sharded["conns"]:
+        conn.send(None)
+    for process in sharded["processes"]:
+        process.join()
+    for conn in sharded["conns"]:
+        conn.close()
+
+def shard_index(ownerName, numOfShards):
+    """
+    Return which of numOfShards shards holds ownerName (a stable hash of its lowercase name).
+    """
+    return zlib.crc32(ownerName.lower().encode("utf-8")) % numOfShards
+
+def shard_of(sharded, ownerName):
+    """
+    Return the index of the shard holding ownerName in this sharded store.
+    """
+    return shard_index(ownerName, len(sharded["conns"]))
+
+def receive(conn):
+    """
+    Return the next reply on conn, raising the exception a shard sent back instead.
+    """
+    status, value = conn.recv()
+    if status == "error":
+        raise value
+    return value
+
+def call_shard(sharded, i, name, *args):
+    """
+    Run one call on shard i and return its result.
+    """
+    sharded["conns"][i].send((name, args))
+    return receive(sharded["conns"][i])
+
+def scatter(sharded, name, *args, perShardArgs=None):
+    """
+    Run a call on every shard at once and gather the results, in shard order.
+    perShardArgs, if given, holds each shard's own argument tuple instead of args.
+    """
+    conns = sharded["conns"]
+    for i, conn in enumerate(conns):
+        conn.send((name, perShardArgs[i] if perShardArgs is not None else args))
+    results = []
+    error = None
+    for conn in conns:
+        # Drain every reply, even after an error, so no answer is left in a pipe
+        try:
+            results.append(receive(conn))
+        except Exception as e:
+            error = error or e
+    if error is not None:
+        raise error
+    return results
+
+def merge_groups(shardGroups):
+    """
+    k-way merge per-shard (key, text) lists that are sorted by key into one stream
+    of text blocks (each one or more output lines).
+    """
+    for _, text in heapq.merge(*shardGroups, key=lambda group: group[0]):
+        yield text
+
+
+########################
+# 3) Scatter-Gather Commands
+########################
+
+def sharded_sort_lines(sharded):
+    """
+    Yield the "Display owners by number of Pokemon" report: each shard hands over
+    its (already sorted) leaderboard and they are k-way merged.
+    """
+    boards = scatter(sharded, "leaderboard")
+    if not any(boards):
+        yield "No owners at all."
+        return
+    yield "=== The Owners we have, sorted by number of Pokemons ==="
+    for size, _, ownerName in heapq.merge(*boards):
+        yield f"Owner: {ownerName} (has {size} Pokemon)"
+
+def sharded_owner_page(sharded, limit, after=None, low=None, high=None):
+    """
+    Return one page of owners across all shards as (lines, cursor), like ex7.owner_page.
+    Raise ValueError if limit is below 1.
+    """
+    if limit < 1:
+        raise ValueError(f"page limit must be at least 1, not {limit}")
+    pages = scatter(sharded, "page", limit + 1, after, low, high)
+    entries = list(heapq.merge(*pages))[:limit + 1]
+    if len(entries) <= limit:
+        return [line for _, line in entries], None
+    entries.pop()
+    return [line for _, line in entries], entries[-1][0]
+
+def apply_sharded_command(sharded, command, out):
+    """
+    Apply one batch command (same format as ex7 batch mode) to the sharded store,
+    appending result lines to out. Single-owner ops go to the owner's shard;
+    sort, print, filter, count, stats, evolve_all, owners, import, savepoint and
+    rollback run on every shard in parallel and their results are merged. Only the
+    in-order print is available, as there is no single tree to walk.
+    """
+    op = command["op"]
+    if op in OWNER_OPS or (op in ("filter", "evolve_all", "stats", "suggest") and "owner" in command):
+        out.extend(call_shard(sharded, shard_of(sharded, command["owner"]), "command", command))
+    elif op == "suggest":
+        # Catalog-only: every shard has the same catalog
+        out.extend(call_shard(sharded, 0, "command", command))
+    elif op == "sort":
+        out.extend(sharded_sort_lines(sharded))
+    elif op == "print":
+        order = command.get("order", "in")
+        if order != "in":
+            raise ValueError(f"print order '{order}' is not available with shards (only 'in')")
+        groups = scatter(sharded, "print")
+        if not any(groups):
+            out.append("No owners at all")
+        out.extend(merge_groups(groups))
+    elif op == "filter":
+        groups = scatter(sharded, "filter", command)
+        if not any(groups):
+            out.append("There are no Pokemons in any Pokedex that match the criteria.")
+        out.extend(merge_groups(groups))
+    elif op == "count":
+        counts = scatter(sharded, "count", command)
+        numOfEntries = sum(entries for entries, _ in counts)
+        numOfOwners = sum(owners for _, owners in counts)
+        out.append(f"{numOfEntries} Pokemon across {numOfOwners} owners match the criteria.")
+    elif op == "stats":
+        if "before" in command:
+            rank = sum(scatter(sharded, "rank", command["before"]))
+            out.append(f"{rank} owners sort before '{command['before']}'.")
+        else:
+            total = {"owners": 0, "pokemon": 0, "types": {}}
+            for stats in scatter(sharded, "stats"):
+                total["owners"] += stats["owners"]
+                total["pokemon"] += stats["pokemon"]
+                for pokeType, count in stats["types"].items():
+                    total["types"][pokeType] = total["types"].get(pokeType, 0) + count
+            out.extend(ex7.population_lines(total))
+    elif op == "evolve_all":
+        count = sum(scatter(sharded, "evolve_all", bool(command.get("fully"))))
+        out.append(f"{count} Pokemon evolved across all owners.")
+    elif op == "owners":
+        low, high = ex7.batch_owner_range(command)
+        lines, cursor = sharded_owner_page(sharded, int(command.get("limit", 50)),
+                                           command.get("after"), low, high)
+        out.extend(lines)
+        out.append(f"Next cursor: {json.dumps(cursor)}")
+    elif op == "import":
+        try:
+            numOfOwners, numOfAdded = import_sharded(sharded, command["path"])
+        except OSError as e:
+            out.append(f"Could not import {command['path']}: {e.strerror}.")
+            return
+        out.append(f"Imported {numOfOwners} new owners; added {numOfAdded} Pokemon to existing owners.")
+    elif op == "savepoint":
+        numOfOwners = sum(scatter(sharded, "savepoint", command["name"]))
+        out.append(f"Savepoint '{command['name']}' set ({numOfOwners} owners).")
+    elif op == "rollback":
+        sizes = scatter(sharded, "rollback", command["name"])
+        if None in sizes:
+            out.append(f"No savepoint named '{command['name']}'.")
+        else:
+            out.append(f"Rolled back to savepoint '{command['name']}' ({sum(sizes)} owners).")
+    else:
+        raise ValueError(f"unknown op '{op}'")
+
+def import_sharded(sharded, path):
+    """
+    Have every shard stream a .csv/.jsonl owner file in parallel and bulk-load the
+    owners that hash to it, so the file is never held in memory here or piped over.
+    Nothing is changed if the file has a bad line.
+    Return (# new owners, # Pokemon added to existing owners).
+    """
+    numOfShards = len(sharded["conns"])
+    path = os.path.abspath(path)
+    results = scatter(sharded, "import_file",
+                      perShardArgs=[(path, i, numOfShards) for i in range(numOfShards)])
+    return sum(new for new, _ in results), sum(added for _, added in results)
+
+def run_sharded_batch(inStream, outStream, sharded):
+    """
+    Like ex7.run_batch, against a sharded store.
+    """
+    ex7.run_batch(inStream, outStream, sharded, apply_sharded_command)
+
+
+########################
+# 4) Scaling Benchmark
+########################
+
+def bench_sharded(numOfOwners, shardCounts, seed, pokedexSize=20):
+    """
+    Load numOfOwners synthetic owners into a single store and into sharded stores
+    of each size in shardCounts, then time the whole-dataset reports on each.
+    Print one line per (shards, op); shards = 0 is the single in-process store.
+    """
+    rng = random.Random(seed)
+    speciesIds = list(ex7.get_hoenn_catalog()["by_id"])
+    records = [(f"owner{i:07d}", [ex7.get_poke_dict_by_id(poke_id)
+                                  for poke_id in rng.sample(speciesIds, min(pokedexSize, len(speciesIds)))])
+               for i in range(numOfOwners)]
+    commands = [("sort", {"op": "sort"}), ("print", {"op": "print"}),
+                ("filter", {"op": "filter", "type": "Fire", "attack_above": 60}),
+                ("count", {"op": "count", "can_evolve": True})]
+    ownerStore = ex7.create_owner_store()
+    ex7.import_owner_records(ownerStore, records)
+    for name, command in commands:
+        start = time.perf_counter()
+        ex7.apply_batch_command(ownerStore, command, [])
+        print(f"shards 0  {name:<7} {(time.perf_counter() - start) * 1000:9.1f} ms")
+    for numOfShards in shardCounts:
+        sharded = create_sharded_store(numOfShards)
+        try:
+            perShard = [[] for _ in range(numOfShards)]
+            for record in records:
+                perShard[shard_of(sharded, record[0])].append(record)
+            scatter(sharded, "import", perShardArgs=[(shardRecords,) for shardRecords in perShard])
+            for name, command in commands:
+                start = time.perf_counter()
+                apply_sharded_command(sharded, command, [])
+                print(f"shards {numOfShards:<2} {name:<7} {(time.perf_counter() - start) * 1000:9.1f} ms")
+        finally:
+            close_sharded_store(sharded)
+
+
+def main():
+    """
+    Entry point: run batch commands (or --bench) against a sharded store.
+    """
+    parser = argparse.ArgumentParser(description="Pokedex owners spread over worker processes.")
+    parser.add_argument("--shards", type=int, default=DEFAULT_SHARDS, help="number of worker processes")
+    parser.add_argument("--batch", nargs="?", const="-", metavar="FILE",
+                        help="apply JSON-lines commands from FILE (or stdin; the default)")
+    parser.add_argument("--data-dir", metavar="DIR", help="persist shard i in DIR/shard-i")
+    parser.add_argument("--import", dest="import_files", action="append", default=[], metavar="FILE",
+                        help="bulk-load owners from a .csv or .jsonl file first (repeatable)")
+    parser.add_argument("--bench", type=int, metavar="OWNERS",
+                        help="time whole-dataset reports on OWNERS synthetic owners, 1 shard up to --shards")
+    parser.add_argument("--seed", type=int, default=2024)
+    ex7.add_species_arguments(parser)
+    args = parser.parse_args()
+    ex7.apply_species_arguments(args)
+    if args.bench:
+        shardCounts = sorted({1, max(args.shards // 2, 1), args.shards})
+        bench_sharded(args.bench, shardCounts, args.seed)
+        return
+    sharded = create_sharded_store(args.shards, args.data_dir)
+    try:
+        for path in args.import_files:
+            try:
+                numOfOwners, numOfAdded = import_sharded(sharded, path)
+            except (OSError, ValueError) as e:
+                sys.exit(f"Could not import owners: {e}")
+            print(f"Imported {numOfOwners} new owners from {path}; added {numOfAdded} Pokemon to existing owners.")
+        if args.batch is None or args.batch == "-":
+            run_sharded_batch(sys.stdin, sys.stdout, sharded)
+        else:
+            with open(args.batch, mode='r', encoding='utf-8') as f:
+                run_sharded_batch(f, sys.stdout, sharded)
+    finally:
+        close_sharded_store(sharded)
+
+if __name__ == "__main__":
+    main()